@@ -4,19 +4,33 @@ Flask web interface for the OPSEC Toolkit
 """
 
 try:
-    from flask import Flask, render_template, jsonify, request, send_file, after_this_request
+    from flask import Flask, Request, abort, render_template, jsonify, request, send_file
+    from werkzeug.datastructures import FileStorage
     HAVE_FLASK = True
 except Exception:
     HAVE_FLASK = False
+try:
+    import orjson
+    # Flask 2.2+ JSON provider interface
+    from flask.json.provider import DefaultJSONProvider
+except ImportError:
+    orjson = None
 import sys
 import os
 import tempfile
 import io
 import shutil
 import atexit
-import time
+import hashlib
 import logging
-from functools import wraps
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict
+from urllib.parse import unquote
+from dataclasses import dataclass, fields
+from functools import cache, wraps
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -24,13 +38,48 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    force=True
 )
+# The format never shows thread, process or caller details, so skip collecting them per record
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
 logger = logging.getLogger(__name__)
 
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024  # 50MB max upload
+
 if HAVE_FLASK:
     app = Flask(__name__)
-    app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max upload
+    app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES
+    # Only enable behind a reverse proxy (nginx/Apache) that serves X-Sendfile itself
+    app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE', 'false').lower() in ('1', 'true', 'yes')
+
+    if orjson is not None:
+        class ORJSONProvider(DefaultJSONProvider):
+            """JSON provider backed by orjson, keeping Flask's sorted keys and debug indenting."""
+
+            def _options(self, indent=False):
+                # Dates go through Flask's default hook so they keep their HTTP-date format
+                option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                if indent:
+                    option |= orjson.OPT_INDENT_2
+                return option
+
+            def dumps(self, obj, **kwargs):
+                return orjson.dumps(obj, default=self.default, option=self._options(kwargs.get('indent'))).decode()
+
+            def loads(self, s, **kwargs):
+                return orjson.loads(s)
+
+            def response(self, *args, **kwargs):
+                # Hand the bytes straight to the response instead of round-tripping through str
+                obj = self._prepare_response_obj(args, kwargs)
+                indent = (self.compact is None and self._app.debug) or self.compact is False
+                body = orjson.dumps(obj, default=self.default, option=self._options(indent) | orjson.OPT_APPEND_NEWLINE)
+                return self._app.response_class(body, mimetype=self.mimetype)
+
+        app.json = ORJSONProvider(app)
 else:
     class _DummyApp:
         def route(self, *args, **kwargs):
@@ -49,7 +98,7 @@ try:
     password_gen = PasswordGenerator()
     logger.info("✓ PasswordGenerator initialized")
 except Exception as e:
-    logger.error(f"✗ Failed to initialize PasswordGenerator: {e}")
+    logger.error("✗ Failed to initialize PasswordGenerator: %s", e)
     password_gen = None
 
 try:
@@ -60,18 +109,51 @@ try:
     helper = CompartmentalizationHelper()
     logger.info("✓ IdentityManager and CompartmentalizationHelper initialized")
 except Exception as e:
-    logger.error(f"✗ Failed to initialize Identity components: {e}")
+    logger.error("✗ Failed to initialize Identity components: %s", e)
     identity_manager = None
     helper = None
 
 try:
-    from metadata_stripper import MetadataStripper
+    from metadata_stripper import MetadataStripper, strip_in_worker
     metadata_stripper = MetadataStripper()
     logger.info("✓ MetadataStripper initialized")
 except Exception as e:
-    logger.error(f"✗ Failed to initialize MetadataStripper: {e}")
+    logger.error("✗ Failed to initialize MetadataStripper: %s", e)
     metadata_stripper = None
 
+STRIP_KINDS = {}
+if metadata_stripper is not None:
+    STRIP_KINDS.update(metadata_stripper.kinds_by_ext)
+
+# PIL re-encoding and mutagen parsing hold the GIL, so image/audio strips run in
+# worker processes; ffmpeg already runs out of process. 0 strips on the request thread.
+STRIP_PROCESSES = int(os.environ.get('STRIP_PROCESSES') or os.cpu_count() or 1)
+STRIP_POOL = None
+_strip_pool_lock = threading.Lock()
+
+def get_strip_pool():
+    global STRIP_POOL
+    with _strip_pool_lock:
+        if STRIP_POOL is None:
+            # spawn rather than fork: other request threads may hold locks at fork time
+            STRIP_POOL = ProcessPoolExecutor(max_workers=STRIP_PROCESSES, mp_context=multiprocessing.get_context('spawn'))
+            atexit.register(STRIP_POOL.shutdown, wait=False, cancel_futures=True)
+        return STRIP_POOL
+
+def strip_file(tmp_path, kind, output_path=None):
+    global STRIP_POOL
+    if STRIP_PROCESSES > 0 and kind in ('image', 'audio'):
+        pool = STRIP_POOL or get_strip_pool()
+        try:
+            return pool.submit(strip_in_worker, tmp_path, kind, output_path).result()
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed on a huge image); start a fresh pool next time
+            with _strip_pool_lock:
+                if STRIP_POOL is pool:
+                    STRIP_POOL = None
+            raise
+    return metadata_stripper.strip_and_count(tmp_path, kind, output_path)
+
 # Noise generator and digital hygiene auditor are not initialized in this build
 noise_generator = None
 hygiene_auditor = None
@@ -85,57 +167,151 @@ def require_api_token(func):
         return func(*args, **kwargs)
     return wrapper
 
+def _default_tmp_mount():
+    # /tmp is often a RAM-capped tmpfs; /var/tmp is disk-backed on Linux
+    if sys.platform.startswith('linux') and os.path.isdir('/var/tmp'):
+        return '/var/tmp'
+    return None
+
+TMP_MOUNT = os.environ.get('OPSEC_TMP_MOUNT') or _default_tmp_mount()
 METADATA_TEMP_DIR = None
-_cleanup_registered = False
+_temp_dir_lock = threading.Lock()
 
+@cache
 def get_metadata_temp_dir():
-    global METADATA_TEMP_DIR, _cleanup_registered
-    if METADATA_TEMP_DIR is None:
-        try:
-            METADATA_TEMP_DIR = tempfile.mkdtemp(prefix='opsec_metadata_')
-            os.chmod(METADATA_TEMP_DIR, 0o700)
-            if not _cleanup_registered:
+    global METADATA_TEMP_DIR, TEMP_ON_SSD
+    with _temp_dir_lock:
+        if METADATA_TEMP_DIR is None:
+            try:
+                METADATA_TEMP_DIR = tempfile.mkdtemp(prefix='opsec_metadata_', dir=TMP_MOUNT)
+                os.chmod(METADATA_TEMP_DIR, 0o700)
                 atexit.register(cleanup_temp_dir)
-                _cleanup_registered = True
-            logger.info(f"Created metadata temp directory: {METADATA_TEMP_DIR}")
-        except Exception as e:
-            logger.warning(f"Failed to create custom temp dir, using system temp: {e}")
-            METADATA_TEMP_DIR = tempfile.gettempdir()
-    return METADATA_TEMP_DIR
+                logger.info("Created metadata temp directory: %s", METADATA_TEMP_DIR)
+                check_temp_space(METADATA_TEMP_DIR)
+                TEMP_ON_SSD = is_solid_state(METADATA_TEMP_DIR)
+            except Exception as e:
+                logger.warning("Failed to create custom temp dir, using system temp: %s", e)
+                METADATA_TEMP_DIR = tempfile.gettempdir()
+        return METADATA_TEMP_DIR
+
+def new_temp_output(prefix, ext):
+    # Reserve the name with O_EXCL and mode 0600 before PIL/ffmpeg open it for writing
+    fd, path = tempfile.mkstemp(prefix=prefix, suffix=ext, dir=get_metadata_temp_dir())
+    os.close(fd)
+    return path
+
+# Overwriting temp uploads does not reach the original blocks on SSDs, tmpfs or
+# CoW filesystems, so by default they are only unlinked; opt in to a zero or random pass.
+SHRED_MODE = os.environ.get('SECURE_DELETE_SHRED', 'false').lower()
+if SHRED_MODE in ('1', 'true', 'yes'):
+    SHRED_MODE = 'zero'
+elif SHRED_MODE not in ('zero', 'random'):
+    SHRED_MODE = None
+_ZERO_CHUNK = memoryview(bytes(1024 * 1024))
+
+TEMP_ON_SSD = False
+_FALLOC_FL_KEEP_SIZE = 0x01
+_FALLOC_FL_PUNCH_HOLE = 0x02
+
+def is_solid_state(path):
+    # Only trust a positive answer from sysfs; unknown devices keep the overwrite path
+    try:
+        dev = os.stat(path).st_dev
+        base = f'/sys/dev/block/{os.major(dev)}:{os.minor(dev)}'
+        for device in (base, os.path.join(base, '..')):
+            rotational = os.path.join(device, 'queue', 'rotational')
+            if os.path.exists(rotational):
+                with open(rotational) as f:
+                    return f.read().strip() == '0'
+    except (AttributeError, OSError):
+        pass
+    return False
+
+def _punch_hole(fd, size):
+    import ctypes
+    libc = ctypes.CDLL(None, use_errno=True)
+    libc.fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_longlong, ctypes.c_longlong]
+    if libc.fallocate(fd, _FALLOC_FL_PUNCH_HOLE | _FALLOC_FL_KEEP_SIZE, 0, size) != 0:
+        raise OSError(ctypes.get_errno(), 'fallocate punch hole failed')
+
+def _shred_pattern():
+    if SHRED_MODE != 'random':
+        return _ZERO_CHUNK
+    # One ChaCha20 keystream per file instead of a getrandom() call per chunk
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms
+    encryptor = Cipher(algorithms.ChaCha20(os.urandom(32), os.urandom(16)), mode=None).encryptor()
+    return memoryview(encryptor.update(_ZERO_CHUNK))
+
+_SHRED_IOV_MAX = 1024
+
+def _overwrite(fd, size, pattern):
+    chunk = len(pattern)
+    if not hasattr(os, 'pwritev'):
+        written = 0
+        while written < size:
+            written += os.write(fd, pattern[:min(chunk, size - written)])
+        return
+    # Repeat the one pattern buffer across an iovec so a whole upload is one syscall
+    batch = [pattern] * min(_SHRED_IOV_MAX, -(-size // chunk))
+    offset = 0
+    while offset < size:
+        full, tail = divmod(size - offset, chunk)
+        if full >= len(batch):
+            iov = batch
+        else:
+            iov = batch[:full] + [pattern[:tail]]
+        written = os.pwritev(fd, iov, offset)
+        if written <= 0:
+            raise OSError('short write while shredding')
+        offset += written
 
-def secure_delete_file(filepath):
+def check_temp_space(path):
     try:
-        if not filepath:
+        st = os.statvfs(path)
+    except (AttributeError, OSError):
+        return
+    # Each request thread may stage an upload plus a stripped copy
+    needed = MAX_UPLOAD_BYTES * 2 * int(os.environ.get('WEB_THREADS', '8'))
+    available = st.f_bavail * st.f_frsize
+    if available < needed:
+        logger.warning(
+            "Metadata temp dir %s has %d MB free, less than %d MB needed for concurrent uploads; set OPSEC_TMP_MOUNT",
+            path, available // (1024 * 1024), needed // (1024 * 1024)
+        )
+
+def secure_delete_file(filepath):
+    if not filepath:
+        return
+    fd = None
+    if SHRED_MODE:
+        # One open + fstat instead of stat-then-open; O_NOFOLLOW keeps us off swapped-in symlinks
+        try:
+            fd = os.open(filepath, os.O_RDWR | getattr(os, 'O_NOFOLLOW', 0))
+        except FileNotFoundError:
             return
-        if os.path.exists(filepath):
-            size = os.path.getsize(filepath)
-            if size > 0:
-                try:
-                    with open(filepath, 'r+b') as f:
-                        f.seek(0)
-                        chunk = 1024 * 1024
-                        written = 0
-                        while written < size:
-                            to_write = min(chunk, size - written)
-                            f.write(os.urandom(to_write))
-                            written += to_write
-                        f.flush()
-                        os.fsync(f.fileno())
-                        f.truncate(0)
-                        f.flush()
-                        os.fsync(f.fileno())
-                except Exception:
-                    pass
-            try:
-                os.unlink(filepath)
-            except Exception:
-                pass
-    except Exception:
+        except OSError:
+            # A symlink (ELOOP) or an unwritable file cannot be overwritten, but the
+            # directory entry still has to go
+            pass
+    if fd is not None:
         try:
-            if filepath and os.path.exists(filepath):
-                os.unlink(filepath)
+            size = os.fstat(fd).st_size
+            if size > 0 and TEMP_ON_SSD:
+                # Wear levelling makes overwrites pointless on flash; release the blocks instead
+                _punch_hole(fd, size)
+            elif size > 0:
+                _overwrite(fd, size, _shred_pattern())
+                os.fsync(fd)
+                if hasattr(os, 'posix_fadvise'):
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
         except Exception:
             pass
+        finally:
+            os.close(fd)
+    try:
+        os.unlink(filepath)
+    except OSError:
+        pass
 
 def cleanup_temp_dir():
     global METADATA_TEMP_DIR
@@ -145,9 +321,267 @@ def cleanup_temp_dir():
     except Exception:
         pass
 
+UPLOAD_WRITE_BUFFER = 1024 * 1024
+INSPECT_HEADER_BYTES = 256 * 1024
+
+INSPECT_CACHE_SIZE = 128
+
+class UploadHead(io.BytesIO):
+    """Keep a JPEG upload in memory up to its first scan and drop the entropy-coded rest.
+
+    Every metadata segment precedes the scan, however large (extended XMP from phone
+    cameras runs to hundreds of KiB), so nothing the inspector reads is cut off. A file
+    whose markers cannot be walked is kept whole.
+    """
+
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+        self.complete = False
+        self._marker = 2
+
+    def write(self, data):
+        if not self.complete:
+            super().write(data)
+            self._walk()
+        elif self.tell() < self.limit:
+            super().write(data[:self.limit - self.tell()])
+        return len(data)
+
+    def _walk(self):
+        buf = self.getbuffer()
+        try:
+            pos = self._marker
+            while pos + 4 <= len(buf):
+                if buf[pos] != 0xFF:
+                    # Not a marker walk we understand; keep everything from here on
+                    pos = len(buf) + MAX_UPLOAD_BYTES
+                    break
+                marker = buf[pos + 1]
+                if marker == 0xFF:
+                    pos += 1
+                    continue
+                if marker == 0xD9:
+                    self.complete = True
+                    break
+                if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+                    pos += 2
+                    continue
+                end = pos + 2 + int.from_bytes(buf[pos + 2:pos + 4], 'big')
+                if marker == 0xDA:
+                    # The scan header itself is read before the image is handed back
+                    self.complete = end <= len(buf)
+                    break
+                pos = end
+            self._marker = pos
+        finally:
+            buf.release()
+
+class HashedUpload:
+    """Digest and size an upload while it is written to its staging stream."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.hasher = hashlib.blake2b(digest_size=16)
+        self.size = 0
+
+    def write(self, data):
+        self.hasher.update(data)
+        self.size += len(data)
+        self.stream.write(data)
+        return len(data)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+_inspect_cache = OrderedDict()
+_inspect_cache_lock = threading.Lock()
+
+def cached_inspect_result(key):
+    with _inspect_cache_lock:
+        result = _inspect_cache.get(key)
+        if result is not None:
+            _inspect_cache.move_to_end(key)
+        return result
+
+def cache_inspect_result(key, result):
+    with _inspect_cache_lock:
+        _inspect_cache[key] = result
+        if len(_inspect_cache) > INSPECT_CACHE_SIZE:
+            _inspect_cache.popitem(last=False)
+
+class TeeUpload:
+    """Write an upload to its staging file and to a live video strip pipe at once."""
+
+    def __init__(self, stream, pipe):
+        self.stream = stream
+        self.pipe = pipe
+
+    def write(self, data):
+        self.stream.write(data)
+        self.pipe.write(data)
+        return len(data)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+class CleanedDownload(io.FileIO):
+    """Cleaned output file that is securely deleted when the server closes the response."""
+
+    def close(self):
+        if not self.closed:
+            super().close()
+            secure_delete_file(self.name)
+
+if HAVE_FLASK:
+    class UploadRequest(Request):
+        # Write multipart file parts straight into the private temp dir instead of
+        # Werkzeug's SpooledTemporaryFile, so handlers never copy the upload again.
+        def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+            ext = os.path.splitext(filename or '')[1].lower()
+            if self.endpoint == 'inspect_metadata':
+                if metadata_stripper is not None and ext in metadata_stripper.header_metadata_formats:
+                    return HashedUpload(UploadHead(INSPECT_HEADER_BYTES))
+                # Inspection only reads, so an anonymous O_TMPFILE inode is enough
+                return HashedUpload(tempfile.TemporaryFile(
+                    mode='w+b', buffering=UPLOAD_WRITE_BUFFER, dir=get_metadata_temp_dir()
+                ))
+            stream = tempfile.NamedTemporaryFile(
+                mode='w+b', buffering=UPLOAD_WRITE_BUFFER, dir=get_metadata_temp_dir(),
+                prefix='upload_', suffix=ext, delete=False
+            )
+            if not hasattr(self, '_upload_paths'):
+                self._upload_paths = []
+                self._video_pipes = []
+            self._upload_paths.append(stream.name)
+            if self.endpoint in ('strip_metadata', 'strip_metadata_info') and STRIP_KINDS.get(ext) == 'video':
+                output_path = new_temp_output('stripped_', ext)
+                self._upload_paths.append(output_path)
+                try:
+                    pipe = metadata_stripper.open_video_strip_pipe(output_path)
+                except OSError:
+                    return stream
+                self._video_pipes.append(pipe)
+                return TeeUpload(stream, pipe)
+            return stream
+
+    app.request_class = UploadRequest
+
+    @app.teardown_request
+    def discard_uploads(exc):
+        for pipe in getattr(request, '_video_pipes', ()):
+            pipe.abort()
+        for path in getattr(request, '_upload_paths', ()):
+            secure_delete_file(path)
+
+    def keep_upload_path(path):
+        # The caller takes over deletion, e.g. once a download response has been sent
+        paths = getattr(request, '_upload_paths', [])
+        if path in paths:
+            paths.remove(path)
+
+UPLOAD_READ_CHUNK = 1024 * 1024
+
+def request_upload():
+    # Single-file clients can skip multipart entirely: send the raw bytes as the
+    # body and name the file with an X-Filename header.
+    if request.mimetype != 'multipart/form-data' and 'X-Filename' in request.headers:
+        filename = unquote(request.headers['X-Filename'])
+        stream = request._get_file_stream(request.content_length, request.mimetype, filename, request.content_length)
+        while chunk := request.stream.read(UPLOAD_READ_CHUNK):
+            stream.write(chunk)
+        stream.seek(0)
+        return FileStorage(stream, filename=filename, content_type=request.mimetype)
+    return request.files.get('file')
+
+def staged_upload_path(file):
+    file.stream.close()
+    return file.stream.name
+
+def request_json():
+    if request.content_length is not None and request.content_length <= 2:
+        return {}
+    return request.get_json(silent=True, cache=False) or {}
+
+def _check_length(name, value):
+    # JSON true/false would otherwise pass as the ints 1 and 0
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ValueError(f'{name} must be a positive integer')
+
+@dataclass
+class GenerateCredentialsRequest:
+    include_passphrase: bool = False
+    password_length: int = 20
+    passphrase_words: int = 5
+
+    def __post_init__(self):
+        _check_length('password_length', self.password_length)
+        _check_length('passphrase_words', self.passphrase_words)
+
+@dataclass
+class GeneratePasswordRequest:
+    length: int = 20
+    include_symbols: bool = True
+
+    def __post_init__(self):
+        _check_length('length', self.length)
+
+@dataclass
+class GeneratePassphraseRequest:
+    words: int = 5
+    separator: str = '-'
+
+    def __post_init__(self):
+        _check_length('words', self.words)
+        if not isinstance(self.separator, str):
+            raise ValueError('separator must be a string')
+
+@dataclass
+class CreateIdentityRequest:
+    name: str = None
+    purpose: str = ''
+    generate_password: bool = True
+    generate_passphrase: bool = False
+    password_length: int = 20
+    passphrase_words: int = 5
+
+    def __post_init__(self):
+        _check_length('password_length', self.password_length)
+        _check_length('passphrase_words', self.passphrase_words)
+
+@cache
+def _request_fields(req_cls):
+    return frozenset(f.name for f in fields(req_cls))
+
+def parse_request(req_cls):
+    data = request_json()
+    if not isinstance(data, dict):
+        data = {}
+    names = _request_fields(req_cls)
+    try:
+        return req_cls(**{k: v for k, v in data.items() if k in names})
+    except ValueError as e:
+        # Rejected by the dataclass's own checks; answer 400 before the handler runs
+        response = jsonify({'success': False, 'error': str(e)})
+        response.status_code = 400
+        abort(response)
+
+@cache
+def rendered_index():
+    # index.html has no template variables, so one render serves every request
+    body = render_template('index.html').encode()
+    return body, hashlib.blake2b(body, digest_size=16).hexdigest()
+
 @app.route('/')
 def index():
-    return render_template('index.html')
+    if app.debug:
+        return render_template('index.html')
+    body, etag = rendered_index()
+    response = app.response_class(body, mimetype='text/html')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 300
+    return response.make_conditional(request)
 
 @app.route('/test-image')
 def test_image():
@@ -156,8 +590,9 @@ def test_image():
         return send_file(test_file, as_attachment=True, download_name='test_image_WITH_METADATA.jpg')
     return jsonify({'error': 'Test image not found'}), 404
 
-@app.route('/api/health', methods=['GET'])
-def health_check():
+@cache
+def health_payload():
+    # Components are only set up at import time, so the health answer never changes
     components = {
         'password_gen': password_gen is not None,
         'identity_manager': identity_manager is not None,
@@ -165,26 +600,28 @@ def health_check():
         'metadata_stripper': metadata_stripper is not None,
     }
     all_ok = all(components.values())
-    return jsonify({
+    body = jsonify({
         'status': 'healthy' if all_ok else 'degraded',
         'components': components
-    }), 200 if all_ok else 503
+    }).get_data()
+    return body, 200 if all_ok else 503
+
+@app.route('/api/health', methods=['GET'])
+def health_check():
+    body, status = health_payload()
+    return app.response_class(body, status=status, mimetype='application/json')
 
 
 @app.route('/api/generate', methods=['POST'])
 def generate_credentials():
     if helper is None:
         return jsonify({'success': False, 'error': 'CompartmentalizationHelper not available'}), 503
-    data = request.json or {}
-    include_passphrase = data.get('include_passphrase', False)
-    password_length = data.get('password_length', 20)
-    passphrase_words = data.get('passphrase_words', 5)
-    creds = helper.generate_credentials_set(include_passphrase=include_passphrase)
-    if password_length != 20 and password_gen is not None:
-        creds['password'] = password_gen.generate_password(length=password_length)
-        creds['password_strength'] = password_gen.get_strength(creds['password'])
-    if include_passphrase and passphrase_words != 5 and password_gen is not None:
-        creds['passphrase'] = password_gen.generate_passphrase(words=passphrase_words)
+    req = parse_request(GenerateCredentialsRequest)
+    creds = helper.generate_credentials_set(
+        include_passphrase=req.include_passphrase,
+        password_length=req.password_length,
+        passphrase_words=req.passphrase_words
+    )
     return jsonify({'success': True, 'credentials': creds})
 
 
@@ -192,10 +629,8 @@ def generate_credentials():
 def generate_password():
     if password_gen is None:
         return jsonify({'success': False, 'error': 'PasswordGenerator not available'}), 503
-    data = request.json or {}
-    length = data.get('length', 20)
-    include_symbols = data.get('include_symbols', True)
-    password = password_gen.generate_password(length=length, symbols=include_symbols)
+    req = parse_request(GeneratePasswordRequest)
+    password = password_gen.generate_password(length=req.length, symbols=req.include_symbols)
     strength = password_gen.get_strength(password)
     return jsonify({'success': True, 'password': password, 'strength': strength})
 
@@ -204,10 +639,8 @@ def generate_password():
 def generate_passphrase():
     if password_gen is None:
         return jsonify({'success': False, 'error': 'PasswordGenerator not available'}), 503
-    data = request.json or {}
-    words = data.get('words', 5)
-    separator = data.get('separator', '-')
-    passphrase = password_gen.generate_passphrase(words=words, separator=separator)
+    req = parse_request(GeneratePassphraseRequest)
+    passphrase = password_gen.generate_passphrase(words=req.words, separator=req.separator)
     return jsonify({'success': True, 'passphrase': passphrase})
 
 
@@ -215,15 +648,11 @@ def generate_passphrase():
 def list_identities():
     if identity_manager is None:
         return jsonify({'success': False, 'error': 'IdentityManager not available'}), 503
-    identity_names = identity_manager.list_identities()
     include_details = request.args.get('details', 'false').lower() == 'true'
     if include_details:
-        identities = {}
-        for name in identity_names:
-            identity = identity_manager.get_identity(name, increment_use=False)
-            if identity:
-                identities[name] = identity
-        return jsonify({'success': True, 'identities': identities, 'count': len(identity_names)})
+        identities = identity_manager.get_all_identities(increment_use=False)
+        return jsonify({'success': True, 'identities': identities, 'count': len(identities)})
+    identity_names = identity_manager.list_identities()
     return jsonify({'success': True, 'identities': identity_names, 'count': len(identity_names)})
 
 
@@ -231,25 +660,20 @@ def list_identities():
 def create_identity():
     if identity_manager is None:
         return jsonify({'success': False, 'error': 'IdentityManager not available'}), 503
-    data = request.json or {}
-    name = data.get('name')
-    if not name:
+    req = parse_request(CreateIdentityRequest)
+    if not req.name:
         return jsonify({'success': False, 'error': 'Name is required'}), 400
-    existing = identity_manager.get_identity(name, increment_use=False)
+    existing = identity_manager.get_identity(req.name, increment_use=False)
     if existing:
         return jsonify({'success': False, 'error': 'Identity with this name already exists'}), 400
-    purpose = data.get('purpose', '')
-    generate_password_flag = data.get('generate_password', True)
-    generate_passphrase_flag = data.get('generate_passphrase', False)
-    password_length = data.get('password_length', 20)
-    passphrase_words = data.get('passphrase_words', 5)
     identity = identity_manager.create_identity(
-        name=name,
-        purpose=purpose,
-        generate_password=generate_password_flag,
-        password_length=password_length,
-        generate_passphrase=generate_passphrase_flag,
-        passphrase_words=passphrase_words
+        name=req.name,
+        purpose=req.purpose,
+        generate_password=req.generate_password,
+        password_length=req.password_length,
+        generate_passphrase=req.generate_passphrase,
+        passphrase_words=req.passphrase_words,
+        score_strength=True
     )
     return jsonify({'success': True, 'identity': identity})
 
@@ -261,6 +685,7 @@ def get_identity(name):
     identity = identity_manager.get_identity(name, increment_use=False)
     if not identity:
         return jsonify({'success': False, 'error': 'Identity not found'}), 404
+    identity_manager.password_strength(identity)
     return jsonify({'success': True, 'identity': identity})
 
 
@@ -268,7 +693,7 @@ def get_identity(name):
 def rotate_identity(name):
     if identity_manager is None:
         return jsonify({'success': False, 'error': 'IdentityManager not available'}), 503
-    identity = identity_manager.rotate_identity(name)
+    identity = identity_manager.rotate_identity(name, score_strength=True)
     if not identity:
         return jsonify({'success': False, 'error': 'Identity not found'}), 404
     return jsonify({'success': True, 'identity': identity})
@@ -284,37 +709,95 @@ def burn_identity(name):
     return jsonify({'success': True, 'message': f'Identity {name} burned'})
 
 
+@app.route('/api/metadata/strip', methods=['POST'])
+def strip_metadata():
+    file = request_upload()
+    if file is None:
+        return jsonify({'success': False, 'error': 'No file provided'}), 400
+    if file.filename == '':
+        return jsonify({'success': False, 'error': 'No file selected'}), 400
+    name, ext = os.path.splitext(file.filename)
+    ext = ext.lower()
+    tmp_path = None
+    output_path = None
+    try:
+        tmp_path = staged_upload_path(file)
+        if metadata_stripper is None:
+            secure_delete_file(tmp_path)
+            return jsonify({'success': False, 'error': 'MetadataStripper not available'}), 503
+        kind = STRIP_KINDS.get(ext)
+        if kind is None:
+            secure_delete_file(tmp_path)
+            return jsonify({'success': False, 'error': f'Unsupported file type: {ext}'}), 400
+        success = False
+        if isinstance(file.stream, TeeUpload):
+            output_path = file.stream.pipe.output_path
+            success, message = file.stream.pipe.finish()
+        elif kind != 'audio':
+            output_path = new_temp_output('clean_', ext)
+        if not success:
+            success, message, _ = strip_file(tmp_path, kind, output_path)
+        if not success:
+            secure_delete_file(output_path)
+            secure_delete_file(tmp_path)
+            return jsonify({'success': False, 'error': message}), 500
+        # Audio is stripped in place
+        clean_path = output_path or tmp_path
+        if clean_path != tmp_path:
+            secure_delete_file(tmp_path)
+        # Hand the server an open file so wsgi.file_wrapper can sendfile(2) it; the
+        # cleaned copy is only shredded once the response has been fully sent
+        keep_upload_path(clean_path)
+        cleaned = CleanedDownload(clean_path)
+        response = send_file(
+            cleaned,
+            mimetype='application/octet-stream',
+            as_attachment=True,
+            download_name=f"{name}_clean{ext}",
+            conditional=True,
+            max_age=0
+        )
+        # Werkzeug only sizes path/BytesIO sources; without a length gunicorn chunks
+        # the body and skips sendfile
+        response.content_length = os.fstat(cleaned.fileno()).st_size
+        return response
+    except Exception as e:
+        secure_delete_file(tmp_path)
+        secure_delete_file(output_path)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @app.route('/api/metadata/strip-info', methods=['POST'])
 def strip_metadata_info():
-    if 'file' not in request.files:
+    file = request_upload()
+    if file is None:
         return jsonify({'success': False, 'error': 'No file provided'}), 400
-    file = request.files['file']
     if file.filename == '':
         return jsonify({'success': False, 'error': 'No file selected'}), 400
     ext = os.path.splitext(file.filename)[1].lower()
     tmp_path = None
     output_path = None
     try:
-        tmp_path = os.path.join(get_metadata_temp_dir(), f"info_{int(time.time() * 1000000)}{ext}")
-        file.save(tmp_path)
-        os.chmod(tmp_path, 0o600)
+        tmp_path = staged_upload_path(file)
         if metadata_stripper is None:
             secure_delete_file(tmp_path)
             return jsonify({'success': False, 'error': 'MetadataStripper not available'}), 503
-        before = metadata_stripper.inspect_metadata(tmp_path)
-        before_count = len(before.get('metadata', {}))
-        if ext in metadata_stripper.supported_image_formats:
-            success, message = metadata_stripper.strip_image_metadata(tmp_path)
-        elif ext in metadata_stripper.supported_audio_formats:
-            success, message = metadata_stripper.strip_audio_metadata(tmp_path)
-        elif ext in metadata_stripper.supported_video_formats:
-            output_path = os.path.join(get_metadata_temp_dir(), f"stripped_{int(time.time() * 1000000)}{ext}")
-            success, message = metadata_stripper.strip_video_metadata(tmp_path, output_path)
-            if success and output_path and os.path.exists(output_path):
-                secure_delete_file(output_path)
-        else:
+        kind = STRIP_KINDS.get(ext)
+        if kind is None:
             secure_delete_file(tmp_path)
             return jsonify({'success': False, 'error': f'Unsupported file type: {ext}'}), 400
+        success = False
+        if isinstance(file.stream, TeeUpload):
+            # ffmpeg has been reading the upload as it arrived; fall back to the staged
+            # copy if the container needed seeking (e.g. MP4 with a trailing moov atom)
+            output_path = file.stream.pipe.output_path
+            success, message = file.stream.pipe.finish()
+            before_count = 0
+        elif kind == 'video':
+            output_path = new_temp_output('stripped_', ext)
+        if not success:
+            success, message, before_count = strip_file(tmp_path, kind, output_path)
+        secure_delete_file(output_path)
         secure_delete_file(tmp_path)
         return jsonify({
             'success': success,
@@ -323,39 +806,67 @@ def strip_metadata_info():
             'metadata_removed': before_count
         })
     except Exception as e:
-        if tmp_path and os.path.exists(tmp_path):
-            secure_delete_file(tmp_path)
-        if output_path and os.path.exists(output_path):
-            secure_delete_file(output_path)
+        secure_delete_file(tmp_path)
+        secure_delete_file(output_path)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @app.route('/api/metadata/inspect', methods=['POST'])
 def inspect_metadata():
-    if 'file' not in request.files:
+    file = request_upload()
+    if file is None:
         return jsonify({'success': False, 'error': 'No file provided'}), 400
-    file = request.files['file']
     ext = os.path.splitext(file.filename)[1].lower()
-    tmp_path = None
     try:
-        tmp_path = os.path.join(get_metadata_temp_dir(), f"inspect_{int(time.time() * 1000000)}{ext}")
-        file.save(tmp_path)
-        os.chmod(tmp_path, 0o600)
         if metadata_stripper is None:
-            secure_delete_file(tmp_path)
             return jsonify({'success': False, 'error': 'MetadataStripper not available'}), 503
-        result = metadata_stripper.inspect_metadata(tmp_path)
-        secure_delete_file(tmp_path)
+        stream = file.stream
+        key = (ext, stream.hasher.digest())
+        result = cached_inspect_result(key)
+        if result is None:
+            result = metadata_stripper.inspect_metadata_stream(stream, ext, stream.size, stringify=True)
+            if 'error' not in result:
+                cache_inspect_result(key, result)
+            elif isinstance(stream.stream, UploadHead):
+                # Only the header was kept, so an empty answer here could hide real tags
+                return jsonify({'success': False, 'error': f"Could not read metadata: {result['error']}"}), 422
+        result = dict(result, file=file.filename)
         return jsonify({
             'success': True,
             'metadata': result
         })
     except Exception as e:
-        if tmp_path and os.path.exists(tmp_path):
-            secure_delete_file(tmp_path)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def run_production_server(host, port):
+    from gunicorn.app.base import BaseApplication
+
+    class _GunicornApp(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    options = {
+        'bind': f'{host}:{port}',
+        'workers': int(os.environ.get('WEB_CONCURRENCY', '4')),
+        'worker_class': os.environ.get('WEB_WORKER_CLASS', 'gthread'),
+        'threads': int(os.environ.get('WEB_THREADS', '8')),
+        'timeout': 120,
+    }
+    if options['worker_class'] in ('gevent', 'eventlet'):
+        # Cooperative workers multiplex slow uploads on one thread; size by connections instead
+        options['worker_connections'] = int(os.environ.get('WEB_WORKER_CONNECTIONS', '1000'))
+    _GunicornApp(options).run()
+
+
 if __name__ == '__main__':
     logger.info("=" * 60)
     logger.info("Starting OPSEC Toolkit Web Server")
@@ -366,9 +877,15 @@ if __name__ == '__main__':
     port = int(os.environ.get('FLASK_PORT', '8000'))
     if HAVE_FLASK and app is not None:
         try:
+            if not debug_mode:
+                try:
+                    run_production_server(host, port)
+                    sys.exit(0)
+                except ImportError:
+                    logger.warning("gunicorn not available, falling back to the Flask development server")
             app.run(host=host, port=port, debug=debug_mode, use_reloader=False, threaded=True)
         except Exception as e:
-            logger.error(f"Failed to start Flask server: {e}")
+            logger.error("Failed to start Flask server: %s", e)
             raise
     else:
         from http.server import HTTPServer, SimpleHTTPRequestHandler
@@ -390,8 +907,8 @@ if __name__ == '__main__':
                 return SimpleHTTPRequestHandler.do_GET(self)
         try:
             server = HTTPServer((host, port), _Handler)
-            logger.info(f"Started simple static server on http://{host}:{port}")
+            logger.info("Started simple static server on http://%s:%s", host, port)
             server.serve_forever()
         except Exception as e:
-            logger.error(f"Failed to start fallback static server: {e}")
+            logger.error("Failed to start fallback static server: %s", e)
             raise
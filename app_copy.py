@@ -452,7 +452,7 @@ def inspect_metadata():
             secure_delete_file(tmp_path)
             return jsonify({'success': False, 'error': 'MetadataStripper not available'}), 503
         
-        result = metadata_stripper.inspect_metadata(tmp_path)
+        result = metadata_stripper.inspect_metadata(tmp_path, stringify=True)
 
         # Ensure temp file is removed
         secure_delete_file(tmp_path)
@@ -2,17 +2,35 @@
 Command-line interface for OPSEC Toolkit
 """
 
+import sys
 import click
+from itertools import chain
 from pathlib import Path
-import json
+from types import SimpleNamespace
 from colorama import init, Fore, Style
 
-from metadata_stripper import MetadataStripper
-from compartmentalization import IdentityManager, CompartmentalizationHelper
+# Metadata, identity and vault modules pull in Pillow, mutagen and cryptography;
+# they are imported inside the commands that need them to keep startup fast
 from password_generator import PasswordGenerator
-from credential_vault import CredentialVault
 
-init(autoreset=True)
+if sys.stdout.isatty():
+    init(autoreset=True)
+else:
+    # Piped output would only have the codes filtered out again on every write,
+    # so leave stdout unwrapped and emit none
+    Fore = SimpleNamespace(**dict.fromkeys(vars(Fore), ''))
+    Style = SimpleNamespace(**dict.fromkeys(vars(Style), ''))
+
+# Row templates for the vault listings, which emit many rows per write.
+# autoreset only fires once per write, so each coloured line resets itself.
+_SHOW_ROW = (f"\n  {Fore.GREEN}Service: {{service}}{Style.RESET_ALL}\n"
+             f"  {Fore.WHITE}ID: {{id}}{Style.RESET_ALL}\n")
+_SHOW_FIELDS = (('username', "  Username: {}\n"), ('email', "  Email: {}\n"),
+                ('password', "  Password: {}\n"), ('notes', "  Notes: {}\n"))
+# Listing rows lead with their newline; echo_via_pager ends the output with one
+_LIST_IDENTITY = f"\n\n  {Fore.GREEN}{{}}:{Style.RESET_ALL}"
+_LIST_ROW = "\n    - {}: {}"
+_HAS_PASSWORD = "🔑"
 
 
 @click.group()
@@ -32,7 +50,7 @@ def password():
 
 
 @password.command()
-@click.option('--length', '-l', default=20, help='Password length (default: 20)')
+@click.option('--length', '-l', default=20, type=click.IntRange(min=1), help='Password length (default: 20)')
 @click.option('--no-uppercase', is_flag=True, help='Exclude uppercase letters')
 @click.option('--no-lowercase', is_flag=True, help='Exclude lowercase letters')
 @click.option('--no-numbers', is_flag=True, help='Exclude numbers')
@@ -41,15 +59,16 @@ def password():
 def generate(length, no_uppercase, no_lowercase, no_numbers, no_symbols, count):
     """Generate random password(s)"""
     gen = PasswordGenerator()
+    passwords = gen.generate_password_batch(
+        count,
+        length=length,
+        uppercase=not no_uppercase,
+        lowercase=not no_lowercase,
+        numbers=not no_numbers,
+        symbols=not no_symbols
+    )
     
-    for i in range(count):
-        pwd = gen.generate_password(
-            length=length,
-            uppercase=not no_uppercase,
-            lowercase=not no_lowercase,
-            numbers=not no_numbers,
-            symbols=not no_symbols
-        )
+    for i, pwd in enumerate(passwords):
         strength = gen.get_strength(pwd)
         
         if count > 1:
@@ -59,21 +78,21 @@ def generate(length, no_uppercase, no_lowercase, no_numbers, no_symbols, count):
 
 
 @password.command()
-@click.option('--words', '-w', default=5, help='Number of words (default: 5)')
+@click.option('--words', '-w', default=5, type=click.IntRange(min=1), help='Number of words (default: 5)')
 @click.option('--separator', '-s', default='-', help='Word separator (default: -)')
 @click.option('--capitalize', is_flag=True, help='Capitalize each word')
 @click.option('--count', '-c', default=1, help='Number of passphrases to generate')
 def passphrase(words, separator, capitalize, count):
     """Generate random passphrase(s)"""
     gen = PasswordGenerator()
+    phrases = gen.generate_passphrase_batch(
+        count,
+        words=words,
+        separator=separator,
+        capitalize=capitalize
+    )
     
-    for i in range(count):
-        phrase = gen.generate_passphrase(
-            words=words,
-            separator=separator,
-            capitalize=capitalize
-        )
-        
+    for i, phrase in enumerate(phrases):
         if count > 1:
             click.echo(f"\n{Fore.CYAN}Passphrase {i+1}:")
         click.echo(f"{Fore.GREEN}{phrase}")
@@ -127,34 +146,64 @@ def vault():
 
 @vault.command()
 @click.password_option(confirmation_prompt=True, help='Master password for the vault')
-def init(password):
+@click.option('--target-ms', default=500, type=click.IntRange(min=0),
+              help='Tune key derivation to take about this long on this machine (0 = fixed default)')
+def init(password, target_ms):
     """Initialize a new credential vault"""
+    from credential_vault import CredentialVault
     v = CredentialVault()
     
     if v.is_initialized():
         click.echo(f"{Fore.YELLOW}Vault already initialized. Use 'vault unlock' to access it.")
         return
     
-    success, message = v.initialize(password)
+    success, message = v.initialize(password, target_ms=target_ms)
     if success:
         click.echo(f"{Fore.GREEN}✓ {message}")
     else:
         click.echo(f"{Fore.RED}✗ {message}")
 
 
+def _open_vault(master_password):
+    """Unlock the vault from the active session or the master password."""
+    from credential_vault import CredentialVault
+    v = CredentialVault()
+    if master_password is None:
+        success, _ = v.unlock_from_session()
+        if success:
+            return v
+        master_password = click.prompt('Master password', hide_input=True)
+    success, message = v.unlock(master_password)
+    if not success:
+        click.echo(f"{Fore.RED}✗ {message}")
+        return None
+    return v
+
+
 @vault.command()
 @click.option('--password', '-p', prompt=True, hide_input=True, help='Master password')
 def unlock(password):
     """Unlock the vault (for current session)"""
+    from credential_vault import CredentialVault
     v = CredentialVault()
     success, message = v.unlock(password)
     
     if success:
         click.echo(f"{Fore.GREEN}✓ {message}")
+        success, message = v.save_session()
+        click.echo(f"{Fore.GREEN if success else Fore.YELLOW}  {message}")
     else:
         click.echo(f"{Fore.RED}✗ {message}")
 
 
+@vault.command()
+def lock():
+    """End the session started by vault unlock and wipe its key"""
+    from credential_vault import CredentialVault
+    CredentialVault().clear_session()
+    click.echo(f"{Fore.GREEN}✓ Vault locked.")
+
+
 @vault.command()
 @click.argument('identity_name')
 @click.option('--service', '-s', required=True, help='Service name (e.g., reddit, twitter)')
@@ -163,14 +212,12 @@ def unlock(password):
               confirmation_prompt=True, help='Password for the service')
 @click.option('--email', '-e', help='Email used for the service')
 @click.option('--notes', '-n', help='Additional notes')
-@click.option('--master-password', prompt=True, hide_input=True, help='Vault master password')
+@click.option('--master-password', hide_input=True,
+              help='Vault master password (prompted unless `vault unlock` is active)')
 def add(identity_name, service, username, password, email, notes, master_password):
     """Add a credential to the vault"""
-    v = CredentialVault()
-    
-    success, message = v.unlock(master_password)
-    if not success:
-        click.echo(f"{Fore.RED}✗ {message}")
+    v = _open_vault(master_password)
+    if v is None:
         return
     
     success, message = v.add_credential(
@@ -190,14 +237,12 @@ def add(identity_name, service, username, password, email, notes, master_passwor
 
 @vault.command()
 @click.argument('identity_name')
-@click.option('--master-password', prompt=True, hide_input=True, help='Vault master password')
+@click.option('--master-password', hide_input=True,
+              help='Vault master password (prompted unless `vault unlock` is active)')
 def show(identity_name, master_password):
     """Show credentials for an identity"""
-    v = CredentialVault()
-    
-    success, message = v.unlock(master_password)
-    if not success:
-        click.echo(f"{Fore.RED}✗ {message}")
+    v = _open_vault(master_password)
+    if v is None:
         return
     
     credentials, message = v.get_credentials(identity_name)
@@ -206,54 +251,51 @@ def show(identity_name, master_password):
         click.echo(f"{Fore.YELLOW}No credentials found for '{identity_name}'.")
         return
     
-    click.echo(f"{Fore.CYAN}Credentials for '{identity_name}':")
+    out = [f"{Fore.CYAN}Credentials for '{identity_name}':{Style.RESET_ALL}\n"]
     for cred in credentials:
-        click.echo(f"\n  {Fore.GREEN}Service: {cred['service']}")
-        click.echo(f"  {Fore.WHITE}ID: {cred['id']}")
-        if cred.get('username'):
-            click.echo(f"  Username: {cred['username']}")
-        if cred.get('email'):
-            click.echo(f"  Email: {cred['email']}")
-        if cred.get('password'):
-            click.echo(f"  Password: {cred['password']}")
-        if cred.get('notes'):
-            click.echo(f"  Notes: {cred['notes']}")
-        click.echo(f"  Created: {cred['created']}")
+        out.append(_SHOW_ROW.format_map(cred))
+        for field, tpl in _SHOW_FIELDS:
+            value = cred.get(field)
+            if value:
+                out.append(tpl.format(value))
+        out.append(f"  Created: {cred['created']}\n")
+    click.echo("".join(out), nl=False)
 
 
 @vault.command()
-@click.option('--master-password', prompt=True, hide_input=True, help='Vault master password')
+@click.option('--master-password', hide_input=True,
+              help='Vault master password (prompted unless `vault unlock` is active)')
 def list(master_password):
     """List all credentials (summary)"""
-    v = CredentialVault()
-    
-    success, message = v.unlock(master_password)
-    if not success:
-        click.echo(f"{Fore.RED}✗ {message}")
+    v = _open_vault(master_password)
+    if v is None:
         return
     
-    summary, message = v.list_all_credentials()
+    summary = v.iter_credential_summary()
+    first = next(summary, None)
     
-    if not summary:
+    if first is None:
         click.echo(f"{Fore.YELLOW}No credentials in vault.")
         return
     
-    click.echo(f"{Fore.CYAN}Vault Contents:")
-    for identity_name, credentials in summary.items():
-        click.echo(f"\n  {Fore.GREEN}{identity_name}:")
-        for cred in credentials:
-            click.echo(f"    - {cred['service']}: {cred.get('username', 'N/A')}")
+    # Feed the pager row by row so large vaults start showing immediately
+    def render():
+        yield f"{Fore.CYAN}Vault Contents:{Style.RESET_ALL}"
+        for identity_name, credentials in chain((first,), summary):
+            yield _LIST_IDENTITY.format(identity_name)
+            for cred in credentials:
+                yield _LIST_ROW.format(cred['service'], cred.get('username', 'N/A'))
+    
+    click.echo_via_pager(render())
 
 
 @vault.command()
-@click.option('--master-password', prompt=True, hide_input=True, help='Vault master password')
+@click.option('--master-password', hide_input=True,
+              help='Vault master password (prompted unless `vault unlock` is active)')
 def stats(master_password):
     """Show vault statistics"""
-    v = CredentialVault()
-    
-    success, message = v.unlock(master_password)
-    if not success:
-        click.echo(f"{Fore.RED}✗ {message}")
+    v = _open_vault(master_password)
+    if v is None:
         return
     
     stats_data, message = v.get_vault_stats()
@@ -268,42 +310,65 @@ def stats(master_password):
         click.echo(f"  Services: {', '.join(stats_data['services'])}")
 
 
+@vault.command()
+@click.option('--master-password', hide_input=True,
+              help='Vault master password (prompted unless `vault unlock` is active)')
+def compact(master_password):
+    """Rewrite the vault as a single snapshot"""
+    v = _open_vault(master_password)
+    if v is None:
+        return
+    
+    success, message = v.compact_vault()
+    if success:
+        click.echo(f"{Fore.GREEN}✓ {message}")
+    else:
+        click.echo(f"{Fore.RED}✗ {message}")
+
+
 @vault.command()
 @click.argument('output_path')
-@click.option('--master-password', prompt=True, hide_input=True, help='Vault master password')
+@click.option('--master-password', hide_input=True,
+              help='Vault master password (prompted unless `vault unlock` is active)')
 @click.option('--export-password', prompt=True, hide_input=True, 
               confirmation_prompt=True, help='Password for the export file')
 def export(output_path, master_password, export_password):
     """Export vault to encrypted file"""
-    v = CredentialVault()
-    
-    success, message = v.unlock(master_password)
-    if not success:
-        click.echo(f"{Fore.RED}✗ {message}")
+    v = _open_vault(master_password)
+    if v is None:
         return
     
-    success, message = v.export_vault(output_path, export_password)
+    # '-' writes the export to stdout, so keep status lines on stderr there
+    to_stderr = output_path == '-'
+    if to_stderr:
+        with click.open_file(output_path, 'wb') as out:
+            success, message = v.export_vault_stream(out, export_password)
+    else:
+        # Written beside the target and renamed over it, so a failed export keeps the old file
+        success, message = v.export_vault(output_path, export_password)
     if success:
-        click.echo(f"{Fore.GREEN}✓ {message}")
+        click.echo(f"{Fore.GREEN}✓ {message}", err=to_stderr)
     else:
-        click.echo(f"{Fore.RED}✗ {message}")
+        click.echo(f"{Fore.RED}✗ {message}", err=to_stderr)
 
 
 @vault.command(name='import')
 @click.argument('import_path')
-@click.option('--master-password', prompt=True, hide_input=True, help='Vault master password')
+@click.option('--master-password', hide_input=True,
+              help='Vault master password (prompted unless `vault unlock` is active)')
 @click.option('--import-password', prompt=True, hide_input=True, help='Import file password')
 @click.option('--merge', is_flag=True, help='Merge with existing vault')
 def import_vault(import_path, master_password, import_password, merge):
     """Import vault from encrypted file"""
-    v = CredentialVault()
-    
-    success, message = v.unlock(master_password)
-    if not success:
-        click.echo(f"{Fore.RED}✗ {message}")
+    v = _open_vault(master_password)
+    if v is None:
         return
     
-    success, message = v.import_vault(import_path, import_password, merge)
+    if import_path == '-':
+        with click.open_file(import_path, 'rb') as src:
+            success, message = v.import_vault_stream(src, import_password, merge)
+    else:
+        success, message = v.import_vault(import_path, import_password, merge)
     if success:
         click.echo(f"{Fore.GREEN}✓ {message}")
     else:
@@ -316,6 +381,7 @@ def import_vault(import_path, master_password, import_password, merge):
               confirmation_prompt=True, help='New master password')
 def change_password(current_password, new_password):
     """Change vault master password"""
+    from credential_vault import CredentialVault
     v = CredentialVault()
     
     success, message = v.change_master_password(current_password, new_password)
@@ -339,20 +405,17 @@ def metadata():
 @click.option('--output', '-o', help='Output file path')
 def strip(file_path, output):
     """Strip metadata from a file"""
+    from metadata_stripper import MetadataStripper
     stripper = MetadataStripper()
     file_path = Path(file_path)
     
     ext = file_path.suffix.lower()
     
-    if ext in stripper.supported_image_formats:
-        success, message = stripper.strip_image_metadata(file_path, output)
-    elif ext in stripper.supported_audio_formats:
-        success, message = stripper.strip_audio_metadata(file_path, output)
-    elif ext in stripper.supported_video_formats:
-        success, message = stripper.strip_video_metadata(file_path, output)
-    else:
+    kind = stripper.kind_for(ext)
+    if kind is None:
         click.echo(f"{Fore.RED}Unsupported file type: {ext}")
         return
+    success, message, _ = stripper.strip_and_count(file_path, kind, output)
     
     if success:
         click.echo(f"{Fore.GREEN}✓ {message}")
@@ -364,6 +427,7 @@ def strip(file_path, output):
 @click.argument('file_path', type=click.Path(exists=True))
 def inspect(file_path):
     """Inspect metadata in a file"""
+    from metadata_stripper import MetadataStripper
     stripper = MetadataStripper()
     result = stripper.inspect_metadata(file_path)
     
@@ -385,10 +449,13 @@ def inspect(file_path):
 @metadata.command()
 @click.argument('directory', type=click.Path(exists=True, file_okay=False))
 @click.option('--recursive', '-r', is_flag=True, help='Process subdirectories')
-def batch(directory, recursive):
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=None,
+              help='Files to process in parallel (default: CPU count)')
+def batch(directory, recursive, jobs):
     """Batch strip metadata from multiple files"""
+    from metadata_stripper import MetadataStripper
     stripper = MetadataStripper()
-    results = stripper.batch_strip(directory, recursive=recursive)
+    results = stripper.batch_strip(directory, recursive=recursive, jobs=jobs)
     
     if "error" in results:
         click.echo(f"{Fore.RED}Error: {results['error']}")
@@ -419,12 +486,13 @@ def identity():
 @click.option('--purpose', '-p', help='Purpose/description of this identity')
 @click.option('--auto-rotate/--no-auto-rotate', default=True, help='Auto-rotate identity')
 @click.option('--generate-password/--no-password', default=True, help='Generate password')
-@click.option('--password-length', default=20, help='Password length (default: 20)')
+@click.option('--password-length', default=20, type=click.IntRange(min=1), help='Password length (default: 20)')
 @click.option('--passphrase', is_flag=True, help='Also generate a passphrase')
-@click.option('--passphrase-words', default=5, help='Number of words in passphrase')
+@click.option('--passphrase-words', default=5, type=click.IntRange(min=1), help='Number of words in passphrase')
 def create(name, purpose, auto_rotate, generate_password, password_length, 
            passphrase, passphrase_words):
     """Create a new compartmentalized identity"""
+    from compartmentalization import IdentityManager
     manager = IdentityManager()
     identity = manager.create_identity(
         name, 
@@ -442,7 +510,7 @@ def create(name, purpose, auto_rotate, generate_password, password_length,
     
     if 'password' in identity:
         click.echo(f"  Password: {identity['password']}")
-        strength = identity.get('password_strength', {})
+        strength = manager.password_strength(identity) or {}
         click.echo(f"  Password strength: {strength.get('description', 'Unknown')}")
     
     if 'passphrase' in identity:
@@ -454,6 +522,7 @@ def create(name, purpose, auto_rotate, generate_password, password_length,
 @click.option('--show-password', is_flag=True, help='Show the password')
 def get(name):
     """Get identity information"""
+    from compartmentalization import IdentityManager
     manager = IdentityManager()
     identity = manager.get_identity(name, increment_use=False)
     
@@ -471,7 +540,7 @@ def get(name):
     
     if 'password' in identity:
         click.echo(f"  Password: {identity['password']}")
-        strength = identity.get('password_strength', {})
+        strength = manager.password_strength(identity) or {}
         click.echo(f"  Password strength: {strength.get('description', 'Unknown')}")
     
     if 'passphrase' in identity:
@@ -484,6 +553,7 @@ def get(name):
               help='Also rotate password')
 def rotate(name, rotate_password):
     """Rotate an identity (generate new alias and password)"""
+    from compartmentalization import IdentityManager
     manager = IdentityManager()
     identity = manager.rotate_identity(name, rotate_password=rotate_password)
     
@@ -501,9 +571,10 @@ def rotate(name, rotate_password):
 
 @identity.command()
 @click.argument('name')
-@click.option('--length', '-l', default=20, help='Password length')
+@click.option('--length', '-l', default=20, type=click.IntRange(min=1), help='Password length')
 def regenerate_password(name, length):
     """Regenerate only the password for an identity"""
+    from compartmentalization import IdentityManager
     manager = IdentityManager()
     identity = manager.regenerate_password(name, password_length=length)
     
@@ -513,7 +584,7 @@ def regenerate_password(name, length):
     
     click.echo(f"{Fore.GREEN}✓ Password regenerated for: {name}")
     click.echo(f"  New password: {identity['password']}")
-    strength = identity.get('password_strength', {})
+    strength = manager.password_strength(identity) or {}
     click.echo(f"  Strength: {strength.get('description', 'Unknown')}")
 
 
@@ -522,6 +593,7 @@ def regenerate_password(name, length):
 @click.confirmation_option(prompt='Are you sure you want to burn this identity?')
 def burn(name):
     """Permanently delete (burn) an identity"""
+    from compartmentalization import IdentityManager
     manager = IdentityManager()
     if manager.burn_identity(name):
         click.echo(f"{Fore.GREEN}✓ Identity burned: {name}")
@@ -532,25 +604,28 @@ def burn(name):
 @identity.command(name='list')
 def list_identities():
     """List all identities"""
+    from compartmentalization import IdentityManager
     manager = IdentityManager()
-    identities = manager.list_identities()
+    identities = manager.get_all_identities()
     
     if not identities:
         click.echo(f"{Fore.YELLOW}No identities found")
         return
     
-    click.echo(f"{Fore.CYAN}Identities ({len(identities)}):")
-    for name in identities:
-        ident = manager.get_identity(name, increment_use=False)
-        has_pwd = "🔑" if ident and 'password' in ident else ""
-        click.echo(f"  {name}: {ident['alias']} (used {ident.get('use_count', 0)} times) {has_pwd}")
+    out = [f"{Fore.CYAN}Identities ({len(identities)}):{Style.RESET_ALL}\n"]
+    for name, ident in identities.items():
+        has_pwd = _HAS_PASSWORD if 'password' in ident else ""
+        out.append(f"  {name}: {ident['alias']} (used {ident.get('use_count', 0)} times) {has_pwd}\n")
+    click.echo("".join(out), nl=False)
 
 
 @identity.command()
-def stats():
+@click.option('--details/--no-details', default=False, help='List per-identity usage')
+def stats(details):
     """Show identity statistics"""
+    from compartmentalization import IdentityManager
     manager = IdentityManager()
-    stats_data = manager.get_identity_stats()
+    stats_data = manager.get_identity_stats() if details else manager.get_totals_only()
     
     click.echo(f"{Fore.CYAN}Identity Statistics:")
     click.echo(f"  Total identities: {stats_data.get('total', 0)}")
@@ -576,6 +651,7 @@ def stats():
 @click.option('--with-passphrase', is_flag=True, help='Also generate passphrase')
 def quickgen(with_passphrase):
     """Quick generate a complete credentials set"""
+    from compartmentalization import CompartmentalizationHelper
     helper = CompartmentalizationHelper()
     creds = helper.generate_credentials_set(include_passphrase=with_passphrase)
     
@@ -10,16 +10,34 @@ import random
 import os
 import base64
 import logging
+import atexit
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
-from cryptography.fernet import Fernet
 import hashlib
+from functools import lru_cache
 
-from password_generator import PasswordGenerator
+from password_generator import PasswordGenerator, random_string
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 
 # Word lists for generating realistic usernames
-ADJECTIVES = [
+ADJECTIVES = (
     "Swift", "Shadow", "Silent", "Dark", "Bright", "Cold", "Wild", "Lone",
     "Ghost", "Cyber", "Neon", "Void", "Storm", "Frost", "Iron", "Steel",
     "Crimson", "Azure", "Onyx", "Silver", "Golden", "Raven", "Wolf", "Hawk",
@@ -27,9 +45,9 @@ ADJECTIVES = [
     "Stealth", "Phantom", "Mystic", "Cryptic", "Hidden", "Masked", "Veiled",
     "Rapid", "Apex", "Prime", "Alpha", "Omega", "Zero", "Null", "Void",
     "Electric", "Thunder", "Lightning", "Blaze", "Ember", "Ash", "Smoke"
-]
+)
 
-NOUNS = [
+NOUNS = (
     "Wolf", "Fox", "Hawk", "Raven", "Phoenix", "Dragon", "Tiger", "Panther",
     "Viper", "Cobra", "Falcon", "Eagle", "Bear", "Lion", "Shark", "Lynx",
     "Knight", "Ninja", "Samurai", "Ronin", "Hunter", "Ranger", "Scout", "Agent",
@@ -37,11 +55,82 @@ NOUNS = [
     "Blade", "Edge", "Storm", "Pulse", "Wave", "Flux", "Spark", "Bolt",
     "Specter", "Wraith", "Shade", "Spirit", "Ghost", "Reaper", "Walker", "Runner",
     "Mind", "Soul", "Heart", "Eye", "Hand", "Fist", "Claw", "Wing"
-]
+)
+
+ADJECTIVES_LOWER = tuple(word.lower() for word in ADJECTIVES)
+NOUNS_LOWER = tuple(word.lower() for word in NOUNS)
+
+# Alias shapes over A/a (adjective, lowercased), N/l (noun, lowercased) and n (number);
+# only the chosen shape is formatted
+ALIAS_FORMATS = ("{A}{N}{n}", "{A}_{N}{n}", "{A}{N}_{n}", "{a}{N}{n}", "{A}{l}{n}")
+ALIAS_FORMATS_NO_NUMBER = ("{A}{N}", "{A}_{N}", "{a}{N}")
+CREDENTIAL_FORMATS = ("{A}{N}{n}", "{A}_{N}{n}", "{a}{N}{n}")
 
-PREFIXES = [
+# Picking a shape is cosmetic; the words and numbers that make an alias hard to
+# guess still come from secrets
+_fmt_rng = random.Random(secrets.token_bytes(32))
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=lambda: _fmt_rng.seed(secrets.token_bytes(32)))
+
+PREFIXES = (
     "The", "Mr", "Dr", "Sir", "Lord", "Agent", "Captain", "Chief", "Master", ""
-]
+)
+
+
+def _dumps(data):
+    # orjson encodes straight to compact bytes; indentation would only grow the
+    # payload the cipher has to encrypt
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode()
+
+
+def _loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Encrypted stores are zstd-compressed first when zstandard is installed; the repeated
+# per-identity keys shrink well, leaving the cipher far fewer bytes to process
+ZSTD_MAGIC = b'Z'
+
+
+def _compress(data):
+    if zstandard is None:
+        return data
+    return ZSTD_MAGIC + zstandard.ZstdCompressor(level=3).compress(data)
+
+
+def _decompress(data):
+    if data[:1] == ZSTD_MAGIC:
+        if zstandard is None:
+            # Loading this as an empty store would let the next save overwrite it
+            raise RuntimeError("Identities store is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data[1:])
+    return data
+
+
+# Derive and parse the store key once per process, however many managers
+# (and tests or scripts constructing them) share the same secret
+@lru_cache(maxsize=4)
+def _derive_fernet_key(secret):
+    return base64.urlsafe_b64encode(hashlib.sha256(secret.encode()).digest())
+
+
+# Raw AES-GCM bytes on disk; stores written as Fernet tokens still decrypt and are
+# rewritten on the next save. Imported here so unencrypted stores never load cryptography
+@lru_cache(maxsize=4)
+def _cipher(key):
+    from credential_vault import VaultCipher
+    return VaultCipher(key)
+
+
+# Use-count bumps from get_identity are coalesced and written this long after the first one
+USE_FLUSH_DELAY = 5.0
+# The sidecar shares the store key, so it authenticates under its own label; otherwise
+# either file's ciphertext would decrypt as the other
+USAGE_AAD = b'usage' + b'OVG1'
 
 
 class IdentityManager:
@@ -51,77 +140,258 @@ class IdentityManager:
         self.data_dir = Path(data_dir).expanduser()
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.identities_file = self.data_dir / "identities.json"
+        self.tmp_file = self.identities_file.with_suffix('.tmp')
+        self.usage_file = self.data_dir / "identities.usage"
+        self.index_file = self.data_dir / "identities.index.json"
+        self._fsync = os.environ.get('IDENTITIES_FSYNC', '1').lower() not in ('0', 'false', 'no')
         self.logger = logging.getLogger(__name__)
 
-        self.fernet = None
+        self.cipher = None
         identities_key = os.environ.get('IDENTITIES_FERNET_KEY')
         if identities_key:
             try:
                 key_bytes = identities_key.encode() if isinstance(identities_key, str) else identities_key
-                self.fernet = Fernet(key_bytes)
+                self.cipher = _cipher(key_bytes)
             except Exception:
                 try:
-                    secret = os.environ.get('SECRET_KEY', '')
-                    digest = hashlib.sha256(secret.encode()).digest()
-                    key = base64.urlsafe_b64encode(digest)
-                    self.fernet = Fernet(key)
+                    self.cipher = _cipher(_derive_fernet_key(os.environ.get('SECRET_KEY', '')))
                 except Exception:
                     self.logger.warning('Failed to initialize Fernet key for identities; storing plaintext')
         else:
             secret = os.environ.get('SECRET_KEY')
             if secret:
                 try:
-                    digest = hashlib.sha256(secret.encode()).digest()
-                    key = base64.urlsafe_b64encode(digest)
-                    self.fernet = Fernet(key)
+                    self.cipher = _cipher(_derive_fernet_key(secret))
                 except Exception:
                     self.logger.warning('Failed to derive Fernet key from SECRET_KEY; storing plaintext')
 
-        self.identities = self._load_identities()
+        # Parsed on first access, so totals-only callers never decrypt the store
+        self._identities = {}
+        self._loaded_stamp = False
+        self._timer_lock = threading.Lock()
+        self._flush_timer = None
+        atexit.register(self.flush)
         self.password_gen = PasswordGenerator()
         enforce = os.environ.get('ENFORCE_ENCRYPTION', 'false').lower() in ('1', 'true', 'yes')
-        if enforce and not self.fernet:
+        if enforce and not self.cipher:
             raise RuntimeError('ENFORCE_ENCRYPTION is set but no IDENTITIES_FERNET_KEY or SECRET_KEY is configured')
 
+    def _store_stamp(self):
+        try:
+            st = os.stat(self.identities_file)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    @property
+    def identities(self):
+        # Another worker process may have saved since we parsed the store; a stat is
+        # far cheaper than re-reading and decrypting it on every lookup
+        stamp = self._store_stamp()
+        if stamp != self._loaded_stamp:
+            self._identities = self._load_identities()
+            self._loaded_stamp = stamp
+        return self._identities
+
     def _load_identities(self):
         if self.identities_file.exists():
             try:
                 with open(self.identities_file, 'rb') as f:
                     data = f.read()
-                if self.fernet:
+                if self.cipher:
                     try:
-                        decrypted = self.fernet.decrypt(data)
-                        return json.loads(decrypted.decode())
+                        data = self.cipher.decrypt(data)
                     except Exception:
                         try:
-                            return json.loads(data.decode())
+                            return _loads(data)
                         except Exception:
                             return {}
+                    return _loads(_decompress(data))
                 else:
-                    return json.loads(data.decode())
+                    return _loads(data)
+            except RuntimeError:
+                raise
             except:
                 return {}
         return {}
 
-    def _save_identities(self):
-        json_data = json.dumps(self.identities, indent=2).encode()
+    @contextmanager
+    def _usage_locked(self):
+        # Held across read-modify-write so concurrent processes never lose a bump
+        fd = os.open(self.usage_file, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o600)
+        with open(fd, 'a+b') as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield f
+
+    def _read_usage(self, f):
+        """Return the name -> [uses, last_used] deltas not yet folded into the store."""
+        f.seek(0)
+        data = f.read()
+        if not data:
+            return {}
         try:
-            if self.fernet:
-                payload = self.fernet.encrypt(json_data)
-            else:
-                payload = json_data
-            tmp_path = self.identities_file.with_suffix('.tmp')
-            with open(tmp_path, 'wb') as f:
+            return _loads(self.cipher.decrypt(data, USAGE_AAD) if self.cipher else data)
+        except Exception:
+            return {}
+
+    def _write_usage(self, f, usage):
+        f.seek(0)
+        f.truncate()
+        if usage:
+            data = _dumps(usage)
+            f.write(self.cipher.encrypt(data, USAGE_AAD) if self.cipher else data)
+        f.flush()
+
+    def _pending_usage(self):
+        try:
+            if os.path.getsize(self.usage_file) == 0:
+                return {}
+        except OSError:
+            return {}
+        with self._usage_locked() as f:
+            return self._read_usage(f)
+
+    def _merge_usage(self, identities, usage):
+        """Return a copy of identities with pending sidecar uses applied."""
+        merged = dict(identities)
+        for name, (uses, last_used) in usage.items():
+            identity = merged.get(name)
+            if identity is not None:
+                merged[name] = dict(identity, use_count=identity.get("use_count", 0) + uses,
+                                    last_used=last_used)
+        return merged
+
+    def _record_use(self, names):
+        # Only the small sidecar is rewritten here; the store is folded later
+        now = datetime.now().isoformat()
+        with self._usage_locked() as f:
+            usage = self._read_usage(f)
+            for name in names:
+                pending = usage.setdefault(name, [0, None])
+                pending[0] += 1
+                pending[1] = now
+            self._write_usage(f, usage)
+        with self._timer_lock:
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(USE_FLUSH_DELAY, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        return usage
+
+    def flush(self):
+        """Fold the usage sidecar into the identities store."""
+        with self._timer_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        if self._pending_usage():
+            self.identities  # pick up saves made by other processes first
+            self._save_identities()
+
+    def _write_anonymous(self, payload, target):
+        # Build the new file in an unnamed O_TMPFILE inode so no partial file is
+        # ever visible, then give it a per-writer name and rename it into place
+        if not hasattr(os, 'O_TMPFILE'):
+            return False
+        try:
+            fd = os.open(self.data_dir, os.O_TMPFILE | os.O_WRONLY, 0o600)
+        except OSError:
+            return False
+        try:
+            with os.fdopen(fd, 'wb', closefd=False) as f:
                 f.write(payload)
+            if self._fsync:
+                os.fsync(fd)
+            link_name = f".{target.name}.{os.getpid()}.{threading.get_ident()}"
+            # A dir_fd makes os.link use linkat(AT_SYMLINK_FOLLOW), which resolves the
+            # /proc magic link to the open inode instead of linking the symlink itself
+            dir_fd = os.open(self.data_dir, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.link(f"/proc/self/fd/{fd}", link_name, dst_dir_fd=dir_fd)
+                os.replace(link_name, target.name, src_dir_fd=dir_fd, dst_dir_fd=dir_fd)
+            except OSError:
+                try:
+                    os.unlink(link_name, dir_fd=dir_fd)
+                except OSError:
+                    pass
+                return False
+            finally:
+                os.close(dir_fd)
+            return True
+        finally:
+            os.close(fd)
+
+    def _save_identities(self):
+        with self._usage_locked() as usage_f:
+            for name, (uses, last_used) in self._read_usage(usage_f).items():
+                identity = self._identities.get(name)
+                if identity is not None:
+                    identity["use_count"] = identity.get("use_count", 0) + uses
+                    identity["last_used"] = last_used
+            self._write_store()
+            self._write_usage(usage_f, {})
+        self._loaded_stamp = self._store_stamp()
+        self._write_index()
+
+    def _replace_file(self, target, tmp_path, payload):
+        """Atomically replace target with payload, readable by the owner only."""
+        if self._write_anonymous(payload, target):
+            return
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            if self._fsync:
                 f.flush()
                 os.fsync(f.fileno())
-            os.replace(tmp_path, self.identities_file)
+        os.replace(tmp_path, target)
+
+    def _write_store(self):
+        json_data = _dumps(self._identities)
+        try:
+            if self.cipher:
+                payload = self.cipher.encrypt(_compress(json_data))
+            else:
+                payload = json_data
+            self._replace_file(self.identities_file, self.tmp_file, payload)
         except Exception as e:
             try:
                 with open(self.identities_file, 'w') as f:
-                    json.dump(self.identities, f, indent=2)
+                    json.dump(self._identities, f, indent=2)
             except Exception:
-                self.logger.error(f"Failed to save identities: {e}")
+                self.logger.error("Failed to save identities: %s", e)
+
+    def _totals(self, identities):
+        return {
+            "total": len(identities),
+            "total_uses": sum(i.get("use_count", 0) for i in identities.values()),
+        }
+
+    def _write_index(self):
+        # Totals only, tagged with the store stamp they were computed from; a
+        # mismatching stamp means the store changed without us and is ignored.
+        # Uses still in the sidecar are added by the reader
+        stamp = self._loaded_stamp
+        index = dict(self._totals(self._identities), stamp=list(stamp) if stamp else None)
+        # The totals are plaintext beside an encrypted store, so keep them owner-only
+        try:
+            self._replace_file(self.index_file, self.index_file.with_suffix('.tmp'),
+                               json.dumps(index).encode())
+        except OSError as e:
+            self.logger.warning("Failed to write identity index: %s", e)
+
+    def get_totals_only(self):
+        stamp = self._store_stamp()
+        usage = self._pending_usage()
+        try:
+            with open(self.index_file) as f:
+                index = json.load(f)
+            if index.get("stamp") == (list(stamp) if stamp else None):
+                return {"total": index["total"],
+                        "total_uses": index["total_uses"] + sum(uses for uses, _ in usage.values())}
+        except (OSError, ValueError, KeyError):
+            pass
+        return self._totals(self._merge_usage(self.identities, usage))
 
     def _secure_overwrite_file(self, path):
         try:
@@ -137,10 +407,13 @@ class IdentityManager:
             with open(path, 'r+b') as f:
                 f.seek(0)
                 chunk = 1024 * 1024
+                # One random block repeated hides the old contents just as well as
+                # fresh entropy per chunk, without a getrandom call per MiB
+                pattern = memoryview(os.urandom(min(chunk, size)))
                 written = 0
                 while written < size:
                     to_write = min(chunk, size - written)
-                    f.write(os.urandom(to_write))
+                    f.write(pattern[:to_write])
                     written += to_write
                 f.flush()
                 os.fsync(f.fileno())
@@ -160,29 +433,18 @@ class IdentityManager:
             chars = string.ascii_lowercase
             if include_numbers:
                 chars += string.digits
-            return ''.join(secrets.choice(chars) for _ in range(length))
+            return random_string(chars, length)
         if style == "word_combo":
-            adjective = secrets.choice(ADJECTIVES)
-            noun = secrets.choice(NOUNS)
+            a = secrets.randbelow(len(ADJECTIVES))
+            n = secrets.randbelow(len(NOUNS))
             if include_numbers:
-                number = secrets.randbelow(1000)
-                formats = [
-                    f"{adjective}{noun}{number}",
-                    f"{adjective}_{noun}{number}",
-                    f"{adjective}{noun}_{number}",
-                    f"{adjective.lower()}{noun}{number}",
-                    f"{adjective}{noun.lower()}{number}",
-                ]
-                return secrets.choice(formats)
+                template, number = _fmt_rng.choice(ALIAS_FORMATS), secrets.randbelow(1000)
             else:
-                formats = [
-                    f"{adjective}{noun}",
-                    f"{adjective}_{noun}",
-                    f"{adjective.lower()}{noun}",
-                ]
-                return secrets.choice(formats)
+                template, number = _fmt_rng.choice(ALIAS_FORMATS_NO_NUMBER), ""
+            return template.format(A=ADJECTIVES[a], a=ADJECTIVES_LOWER[a],
+                                   N=NOUNS[n], l=NOUNS_LOWER[n], n=number)
         elif style == "simple":
-            word = secrets.choice(NOUNS).lower()
+            word = secrets.choice(NOUNS_LOWER)
             if include_numbers:
                 number = secrets.randbelow(1000)
                 return f"{word}{number}"
@@ -191,11 +453,12 @@ class IdentityManager:
             chars = string.ascii_lowercase
             if include_numbers:
                 chars += string.digits
-            return ''.join(secrets.choice(chars) for _ in range(12))
+            return random_string(chars, 12)
 
     def create_identity(self, name, purpose="", auto_rotate=True, 
                        generate_password=True, password_length=20,
-                       generate_passphrase=False, passphrase_words=5):
+                       generate_passphrase=False, passphrase_words=5,
+                       score_strength=False):
         identity = {
             "name": name,
             "purpose": purpose,
@@ -210,7 +473,8 @@ class IdentityManager:
         if generate_password:
             password = self.password_gen.generate_password(length=password_length)
             identity["password"] = password
-            identity["password_strength"] = self.password_gen.get_strength(password)
+            if score_strength:
+                identity["password_strength"] = self.password_gen.get_strength(password)
         if generate_passphrase:
             identity["passphrase"] = self.password_gen.generate_passphrase(
                 words=passphrase_words
@@ -220,50 +484,64 @@ class IdentityManager:
         return identity
 
     def get_identity(self, name, increment_use=True):
-        if name in self.identities:
-            identity = self.identities[name]
-            if increment_use:
-                identity["last_used"] = datetime.now().isoformat()
-                identity["use_count"] = identity.get("use_count", 0) + 1
-                self._save_identities()
+        identity = self.identities.get(name)
+        if identity is None:
+            return None
+        usage = self._record_use((name,)) if increment_use else self._pending_usage()
+        pending = usage.get(name)
+        if pending is None:
             return identity
-        return None
+        return dict(identity, use_count=identity.get("use_count", 0) + pending[0], last_used=pending[1])
 
-    def rotate_identity(self, name, rotate_password=True):
-        if name not in self.identities:
+    def password_strength(self, identity):
+        """Return the identity's password strength, scoring it on first read."""
+        if "password" not in identity:
+            return None
+        strength = identity.get("password_strength")
+        if strength is None:
+            strength = identity["password_strength"] = self.password_gen.get_strength(identity["password"])
+        return strength
+
+    def _set_password(self, identity, password, score_strength):
+        identity["password"] = password
+        if score_strength:
+            identity["password_strength"] = self.password_gen.get_strength(password)
+        else:
+            identity.pop("password_strength", None)
+
+    def rotate_identity(self, name, rotate_password=True, score_strength=False):
+        identity = self.identities.get(name)
+        if identity is None:
             return None
-        identity = self.identities[name]
         old_alias = identity["alias"]
         identity["alias"] = self.generate_alias()
         identity["email_prefix"] = self.generate_alias(8)
         identity["last_rotated"] = datetime.now().isoformat()
-        identity["previous_aliases"] = identity.get("previous_aliases", [])
-        identity["previous_aliases"].append(old_alias)
+        identity.setdefault("previous_aliases", []).append(old_alias)
         if rotate_password and "password" in identity:
             old_password = identity["password"]
-            identity["password"] = self.password_gen.generate_password()
-            identity["password_strength"] = self.password_gen.get_strength(identity["password"])
-            identity["previous_passwords"] = identity.get("previous_passwords", [])
+            self._set_password(identity, self.password_gen.generate_password(), score_strength)
+            identity.setdefault("previous_passwords", [])
             identity["rotated_passwords_count"] = identity.get("rotated_passwords_count", 0) + 1
         if "passphrase" in identity:
             identity["passphrase"] = self.password_gen.generate_passphrase()
         self._save_identities()
         return identity
 
-    def regenerate_password(self, name, password_length=20):
-        if name not in self.identities:
+    def regenerate_password(self, name, password_length=20, score_strength=False):
+        identity = self.identities.get(name)
+        if identity is None:
             return None
-        identity = self.identities[name]
-        identity["password"] = self.password_gen.generate_password(length=password_length)
-        identity["password_strength"] = self.password_gen.get_strength(identity["password"])
+        self._set_password(identity, self.password_gen.generate_password(length=password_length),
+                           score_strength)
         identity["password_regenerated"] = datetime.now().isoformat()
         self._save_identities()
         return identity
 
     def add_passphrase(self, name, words=5):
-        if name not in self.identities:
+        identity = self.identities.get(name)
+        if identity is None:
             return None
-        identity = self.identities[name]
         identity["passphrase"] = self.password_gen.generate_passphrase(words=words)
         self._save_identities()
         return identity
@@ -272,12 +550,13 @@ class IdentityManager:
         if name in self.identities:
             del self.identities[name]
             self._save_identities()
+            # The save renamed a new store over the old one, so only a leftover temp
+            # file can still hold the burned identity. Wiping the store itself would
+            # make every other process reload it as empty
             try:
-                tmp_path = self.identities_file.with_suffix('.tmp')
+                tmp_path = self.tmp_file
                 if tmp_path.exists():
                     self._secure_overwrite_file(tmp_path)
-                if self.identities_file.exists():
-                    self._secure_overwrite_file(self.identities_file)
             except Exception:
                 pass
             return True
@@ -286,15 +565,20 @@ class IdentityManager:
     def list_identities(self):
         return list(self.identities.keys())
 
+    def get_all_identities(self, increment_use=False):
+        identities = self.identities
+        if increment_use and identities:
+            usage = self._record_use(identities)
+        else:
+            usage = self._pending_usage()
+        return self._merge_usage(identities, usage)
+
     def get_identity_stats(self):
-        if not self.identities:
+        identities = self._merge_usage(self.identities, self._pending_usage())
+        if not identities:
             return {"total": 0, "total_uses": 0}
-        stats = {
-            "total": len(self.identities),
-            "total_uses": sum(i.get("use_count", 0) for i in self.identities.values()),
-            "identities": {}
-        }
-        for name, identity in self.identities.items():
+        stats = dict(self._totals(identities), identities={})
+        for name, identity in identities.items():
             stats["identities"][name] = {
                 "use_count": identity.get("use_count", 0),
                 "created": identity.get("created"),
@@ -305,9 +589,10 @@ class IdentityManager:
         return stats
 
     def add_note(self, name, note):
-        if name not in self.identities:
+        identity = self.identities.get(name)
+        if identity is None:
             return False
-        self.identities[name]["notes"].append({
+        identity.setdefault("notes", []).append({
             "text": note,
             "added": datetime.now().isoformat()
         })
@@ -315,9 +600,10 @@ class IdentityManager:
         return True
 
     def update_purpose(self, name, purpose):
-        if name not in self.identities:
+        identity = self.identities.get(name)
+        if identity is None:
             return False
-        self.identities[name]["purpose"] = purpose
+        identity["purpose"] = purpose
         self._save_identities()
         return True
 
@@ -327,28 +613,24 @@ class CompartmentalizationHelper:
         self.password_gen = PasswordGenerator()
     @staticmethod
     def generate_mac_address():
-        return ':'.join(f'{secrets.randbelow(256):02x}' for _ in range(6))
+        return os.urandom(6).hex(':')
     @staticmethod
     def generate_operation_id():
         return secrets.token_hex(16)
-    def generate_credentials_set(self, include_passphrase=False, username_style="word_combo"):
-        adjective = secrets.choice(ADJECTIVES)
-        noun = secrets.choice(NOUNS)
+    def generate_credentials_set(self, include_passphrase=False, username_style="word_combo",
+                                 password_length=20, passphrase_words=5):
+        a = secrets.randbelow(len(ADJECTIVES))
+        n = secrets.randbelow(len(NOUNS))
         number = secrets.randbelow(1000)
         if username_style == "word_combo":
-            formats = [
-                f"{adjective}{noun}{number}",
-                f"{adjective}_{noun}{number}",
-                f"{adjective.lower()}{noun}{number}",
-            ]
-            alias = secrets.choice(formats)
+            alias = _fmt_rng.choice(CREDENTIAL_FORMATS).format(
+                A=ADJECTIVES[a], a=ADJECTIVES_LOWER[a], N=NOUNS[n], n=number)
         elif username_style == "simple":
-            alias = f"{noun.lower()}{number}"
+            alias = f"{NOUNS_LOWER[n]}{number}"
         else:
-            alias = ''.join(secrets.choice(string.ascii_lowercase + string.digits) 
-                           for _ in range(12))
-        email_prefix = f"{adjective.lower()}{noun.lower()}{number}"
-        password = self.password_gen.generate_password()
+            alias = random_string(string.ascii_lowercase + string.digits, 12)
+        email_prefix = f"{ADJECTIVES_LOWER[a]}{NOUNS_LOWER[n]}{number}"
+        password = self.password_gen.generate_password(length=password_length)
         credentials = {
             "username": alias,
             "email_prefix": email_prefix,
@@ -357,7 +639,7 @@ class CompartmentalizationHelper:
             "generated": datetime.now().isoformat()
         }
         if include_passphrase:
-            credentials["passphrase"] = self.password_gen.generate_passphrase()
+            credentials["passphrase"] = self.password_gen.generate_passphrase(words=passphrase_words)
         return credentials
     @staticmethod
     def create_compartment_checklist(operation_name):
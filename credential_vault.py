@@ -4,15 +4,322 @@ Securely store and manage credentials with encryption.
 """
 
 import json
+import os
 import base64
 import hashlib
 import secrets
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
-from cryptography.fernet import Fernet
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    from cryptography.hazmat.primitives.kdf.argon2 import Argon2id
+except ImportError:
+    # cryptography < 44: new vaults keep using PBKDF2
+    Argon2id = None
+
+KDF_ITERATIONS = 600000
+# Argon2id for new vaults: 64 MiB per derivation makes GPU guessing expensive
+ARGON2_MEMORY_COST = 65536
+ARGON2_ITERATIONS = 3
+ARGON2_LANES = 4
+PBKDF2_PARAMS = {"algorithm": "pbkdf2-sha256", "iterations": KDF_ITERATIONS}
+# Prefix of AES-256-GCM payloads; anything else is a Fernet token from an older vault
+GCM_MAGIC = b'OVG2'
+GCM_NONCE_SIZE = 12
+# ChaCha20-Poly1305 payloads, written instead on CPUs without AES instructions
+CHACHA_MAGIC = b'OVC2'
+# Payloads sealed with the raw vault key, from before each algorithm got its own subkey;
+# still read, never written
+LEGACY_GCM_MAGIC = b'OVG1'
+LEGACY_CHACHA_MAGIC = b'OVC1'
+# Associated data when the caller binds none; unchanged so older payloads still open
+DEFAULT_AAD = b'OVG1'
+# Streamed exports: header is magic, frame size, salt and nonce prefix, followed by
+# AES-GCM frames whose nonce and associated data bind the frame number and last flag
+STREAM_MAGIC = b'OVS1'
+STREAM_CHUNK_SIZE = 65536
+GCM_TAG_SIZE = 16
+STREAM_PREFIX_SIZE = GCM_NONCE_SIZE - 8
+STREAM_HEADER_SIZE = len(STREAM_MAGIC) + 4 + 32 + STREAM_PREFIX_SIZE
+# The vault file is a log: a header, a snapshot record and then appended add/update
+# records, each length-prefixed. The header carries a random id per snapshot and every
+# record's associated data covers the header and the record's position, so a record
+# from another snapshot, or moved within this one, never authenticates.
+# Two sealed record counts follow the header; each append rewrites the slot for its new
+# count after the record is on disk, so a torn slot write leaves the previous count
+# readable. Records missing below the count mean the file was cut short; only one frame
+# past it, an append interrupted before it was counted, is tolerated
+LOG_MAGIC = b'OVL3'
+LOG_COUNT_SIZE = len(GCM_MAGIC) + GCM_NONCE_SIZE + 8 + GCM_TAG_SIZE
+# Headed logs from before the count, and logs from before the header, which bind
+# records to this magic and their position only
+UNCOUNTED_LOG_MAGIC = b'OVL2'
+LEGACY_LOG_MAGIC = b'OVL1'
+LOG_MAGICS = (LOG_MAGIC, UNCOUNTED_LOG_MAGIC, LEGACY_LOG_MAGIC)
+LOG_COMPACT_MIN = 64
+KEY_CACHE_SIZE = 4
+# `vault unlock` leaves the derived key in the per-user runtime dir (tmpfs, 0600)
+# so later commands in the same login skip the KDF until the session expires
+SESSION_TTL = 900
+SESSION_FILE_NAME = "opsec-vault.session"
+# Derived keys for recent (salt, password) pairs so repeated unlocks in one process skip
+# the PBKDF2 run; entries are keyed by a salted digest, never the password itself
+_key_cache = OrderedDict()
+_key_cache_lock = threading.Lock()
+
+
+def clear_key_cache():
+    with _key_cache_lock:
+        _key_cache.clear()
+
+
+def calibrate_iterations(target_ms, sample_iterations=100000):
+    """PBKDF2 iteration count that takes about target_ms here, never below KDF_ITERATIONS."""
+    kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=secrets.token_bytes(32),
+                     iterations=sample_iterations)
+    start = time.perf_counter()
+    kdf.derive(b'calibration')
+    elapsed = time.perf_counter() - start
+    return max(KDF_ITERATIONS, int(sample_iterations * (target_ms / 1000) / elapsed))
+
+
+def calibrate_argon2_iterations(target_ms):
+    """Argon2id pass count that takes about target_ms here, never below ARGON2_ITERATIONS."""
+    kdf = Argon2id(salt=secrets.token_bytes(32), length=32, iterations=1,
+                   lanes=ARGON2_LANES, memory_cost=ARGON2_MEMORY_COST)
+    start = time.perf_counter()
+    kdf.derive(b'calibration')
+    elapsed = time.perf_counter() - start
+    return max(ARGON2_ITERATIONS, int((target_ms / 1000) / elapsed))
+
+
+def new_kdf_params(target_ms=None):
+    """KDF parameters for a new vault or password: Argon2id when available, else PBKDF2."""
+    if Argon2id is not None:
+        iterations = calibrate_argon2_iterations(target_ms) if target_ms else ARGON2_ITERATIONS
+        return {"algorithm": "argon2id", "iterations": iterations,
+                "memory_cost": ARGON2_MEMORY_COST, "lanes": ARGON2_LANES}
+    iterations = calibrate_iterations(target_ms) if target_ms else KDF_ITERATIONS
+    return {"algorithm": "pbkdf2-sha256", "iterations": iterations}
+
+
+def _has_aes_instructions():
+    """False only when the CPU flag list is readable and lacks AES."""
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith(('flags', 'Features')):
+                    return 'aes' in line.split()
+    except OSError:
+        pass
+    return True
+
+
+PREFER_CHACHA = not _has_aes_instructions()
+
+
+def _subkey(raw, label):
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=label).derive(raw)
+
+
+class VaultCipher:
+    """AES-256-GCM or ChaCha20-Poly1305 for new payloads, Fernet for reading older ones."""
+
+    def __init__(self, key):
+        # Fernet also rejects keys that are not 32 urlsafe-base64 bytes
+        self.fernet = Fernet(key)
+        raw = base64.urlsafe_b64decode(key)
+        # New payloads use an HKDF subkey per algorithm, so no key material is shared
+        # across them; the raw key only opens payloads written before the split
+        self.aeads = {
+            GCM_MAGIC: AESGCM(_subkey(raw, b'obscura vault aes-256-gcm')),
+            CHACHA_MAGIC: ChaCha20Poly1305(_subkey(raw, b'obscura vault chacha20-poly1305')),
+            LEGACY_GCM_MAGIC: AESGCM(raw),
+            LEGACY_CHACHA_MAGIC: ChaCha20Poly1305(raw),
+        }
+
+    def encrypt(self, data, aad=DEFAULT_AAD):
+        nonce = os.urandom(GCM_NONCE_SIZE)
+        magic = CHACHA_MAGIC if PREFER_CHACHA else GCM_MAGIC
+        return magic + nonce + self.aeads[magic].encrypt(nonce, data, aad)
+
+    def decrypt(self, token, aad=DEFAULT_AAD):
+        aead = self.aeads.get(token[:len(GCM_MAGIC)])
+        if aead is None:
+            return self.fernet.decrypt(token)
+        nonce = token[len(GCM_MAGIC):len(GCM_MAGIC) + GCM_NONCE_SIZE]
+        return aead.decrypt(nonce, token[len(GCM_MAGIC) + GCM_NONCE_SIZE:], aad)
+
+
+def _frame_nonce(prefix, frame_no):
+    return prefix + frame_no.to_bytes(8, 'big')
+
+
+def _frame_aad(header, frame_no, last):
+    return header + frame_no.to_bytes(8, 'big') + (b'\x01' if last else b'\x00')
+
+
+def write_frames(out, aead, header, prefix, chunks):
+    """Encrypt an iterable of plaintext chunks to out, one frame each."""
+    out.write(header)
+    frame_no = 0
+    pending = None
+    for chunk in chunks:
+        if pending is not None:
+            out.write(aead.encrypt(_frame_nonce(prefix, frame_no), pending, _frame_aad(header, frame_no, False)))
+            frame_no += 1
+        pending = chunk
+    out.write(aead.encrypt(_frame_nonce(prefix, frame_no), pending or b'', _frame_aad(header, frame_no, True)))
+
+
+def iter_frames(src, aead, header, prefix, chunk_size):
+    """Yield decrypted plaintext chunks, rejecting reordered or truncated streams."""
+    frame_size = chunk_size + GCM_TAG_SIZE
+    frame_no = 0
+    frame = src.read(frame_size)
+    while True:
+        following = src.read(frame_size) if len(frame) == frame_size else b''
+        last = not following
+        yield aead.decrypt(_frame_nonce(prefix, frame_no), frame, _frame_aad(header, frame_no, last))
+        if last:
+            return
+        frame = following
+        frame_no += 1
+
+
+class _FrameReader:
+    """File-like view of decrypted frames, so a parser can consume them as they arrive."""
+
+    def __init__(self, frames):
+        self._frames = frames
+        self._buffer = b''
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._frames, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def _json_chunks(data, chunk_size):
+    buffer = bytearray()
+    for piece in json.JSONEncoder(separators=(',', ':')).iterencode(data):
+        buffer += piece.encode()
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer[:chunk_size])
+            del buffer[:chunk_size]
+    yield bytes(buffer)
+
+
+def _log_header(fields):
+    body = _dumps(fields)
+    return LOG_MAGIC + len(body).to_bytes(4, 'big') + body
+
+
+def _split_log(data):
+    """Return (header bytes, header fields, offset of the first record) of a vault log."""
+    if data.startswith(LEGACY_LOG_MAGIC):
+        return LEGACY_LOG_MAGIC, {}, len(LEGACY_LOG_MAGIC)
+    start = len(LOG_MAGIC) + 4
+    end = start + int.from_bytes(data[len(LOG_MAGIC):start], 'big')
+    if len(data) < end:
+        raise ValueError("Truncated vault header.")
+    return bytes(data[:end]), _loads(data[start:end]), end
+
+
+def _apply_entry(vault_data, entry):
+    if entry["op"] == "add":
+        vault_data["credentials"].setdefault(entry["identity"], []).append(entry["credential"])
+    elif entry["op"] == "update":
+        for cred in vault_data["credentials"].get(entry["identity"], []):
+            if cred["id"] == entry["id"]:
+                cred.update(entry["fields"])
+                break
+
+
+@contextmanager
+def _atomic_open(path):
+    """Yield a file beside path that replaces it only once the block completes."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _merge_into(vault_data, pairs, added=None):
+    """Append credentials whose ids are not already present; returns how many were skipped."""
+    skipped = 0
+    for identity_name, credentials in pairs:
+        existing = vault_data["credentials"].setdefault(identity_name, [])
+        # Credential ids are unique, so a record whose id is already present is the
+        # same credential (possibly an older copy); keeping one avoids ambiguous ids
+        seen = {cred["id"] for cred in existing}
+        for cred in credentials:
+            if cred["id"] in seen:
+                skipped += 1
+                continue
+            seen.add(cred["id"])
+            existing.append(cred)
+            if added is not None:
+                added.append((identity_name, [cred]))
+    return skipped
+
+
+def _write_atomic(path, data):
+    """Write beside path and rename over it, so a crash never leaves a torn file."""
+    with _atomic_open(path) as f:
+        f.write(data)
+
+
+def _dumps(data):
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode()
+
+
+def _loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 class CredentialVault:
     """
@@ -24,40 +331,103 @@ class CredentialVault:
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.vault_file = self.data_dir / "vault.enc"
         self.salt_file = self.data_dir / "vault.salt"
-        self.fernet = None
+        self.kdf_file = self.data_dir / "vault.kdf"
+        self.lock_file = self.data_dir / "vault.lock"
+        runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+        self.session_file = Path(runtime_dir) / SESSION_FILE_NAME if runtime_dir else None
+        self.cipher = None
+        self._key = None
+        self._salt = None
+        self._kdf = None
         self.is_unlocked = False
+        self._cached_vault = None
+        self._cached_for = None
+        # identity -> lowercased service -> first matching credential, rebuilt on demand
+        self._service_index = None
+        self._log_header = None
+        self._log_seq = None
+        self._log_appended = 0
 
-    def _derive_key(self, master_password, salt):
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=600000,
-        )
+    def _read_header(self):
+        """Header fields of the vault file, or {} for vaults written before the header."""
+        try:
+            with open(self.vault_file, 'rb') as f:
+                head = f.read(len(LOG_MAGIC) + 4)
+                if len(head) < len(LOG_MAGIC) + 4 or not head.startswith((LOG_MAGIC, UNCOUNTED_LOG_MAGIC)):
+                    return {}
+                return _loads(f.read(int.from_bytes(head[len(LOG_MAGIC):], 'big')))
+        except FileNotFoundError:
+            return {}
+
+    def _kdf_inputs(self):
+        """Return the (salt, KDF parameters) the vault key is derived with."""
+        header = self._read_header()
+        if "salt" in header:
+            return base64.b64decode(header["salt"]), header["kdf"]
+        # Older vaults keep both beside the vault file; those created before calibration
+        # have no parameter file and use the fixed count
+        with open(self.salt_file, 'rb') as f:
+            salt = f.read()
+        try:
+            with open(self.kdf_file) as f:
+                params = json.load(f)
+        except FileNotFoundError:
+            return salt, PBKDF2_PARAMS
+        params.setdefault("algorithm", "pbkdf2-sha256")
+        return salt, params
+
+    def _derive_key(self, master_password, salt, params=PBKDF2_PARAMS):
+        cache_key = (salt, tuple(sorted(params.items())),
+                     hashlib.blake2b(master_password.encode(), key=salt[:64], digest_size=32).digest())
+        with _key_cache_lock:
+            key = _key_cache.get(cache_key)
+            if key is not None:
+                _key_cache.move_to_end(cache_key)
+                return key
+        if params["algorithm"] == "argon2id":
+            if Argon2id is None:
+                raise Exception("This vault uses Argon2id, which needs cryptography 44 or newer.")
+            kdf = Argon2id(
+                salt=salt,
+                length=32,
+                iterations=int(params["iterations"]),
+                lanes=int(params["lanes"]),
+                memory_cost=int(params["memory_cost"]),
+            )
+        else:
+            kdf = PBKDF2HMAC(
+                algorithm=hashes.SHA256(),
+                length=32,
+                salt=salt,
+                iterations=int(params["iterations"]),
+            )
         key = base64.urlsafe_b64encode(kdf.derive(master_password.encode()))
+        with _key_cache_lock:
+            _key_cache[cache_key] = key
+            while len(_key_cache) > KEY_CACHE_SIZE:
+                _key_cache.popitem(last=False)
         return key
 
-    def _get_salt(self):
-        if self.salt_file.exists():
-            with open(self.salt_file, 'rb') as f:
-                return f.read()
-        else:
-            salt = secrets.token_bytes(32)
-            with open(self.salt_file, 'wb') as f:
-                f.write(salt)
-            return salt
+    def _use_key(self, key, salt, params):
+        # The salt and parameters travel with the key so every snapshot header names
+        # exactly what the key was derived from
+        self.cipher = VaultCipher(key)
+        self._key = key
+        self._salt = salt
+        self._kdf = params
 
     def is_initialized(self):
-        return self.vault_file.exists() and self.salt_file.exists()
+        return self.vault_file.exists() and ("salt" in self._read_header() or self.salt_file.exists())
 
-    def initialize(self, master_password):
+    def initialize(self, master_password, target_ms=None):
         if self.is_initialized():
             return False, "Vault already initialized. Use 'unlock' instead."
         if len(master_password) < 8:
             return False, "Master password must be at least 8 characters."
-        salt = self._get_salt()
-        key = self._derive_key(master_password, salt)
-        self.fernet = Fernet(key)
+        params = new_kdf_params(target_ms)
+        salt = secrets.token_bytes(32)
+        key = self._derive_key(master_password, salt, params)
+        self._use_key(key, salt, params)
         self.is_unlocked = True
         vault_data = {
             "created": datetime.now().isoformat(),
@@ -70,38 +440,286 @@ class CredentialVault:
     def unlock(self, master_password):
         if not self.is_initialized():
             return False, "Vault not initialized. Use 'init' first."
-        salt = self._get_salt()
-        key = self._derive_key(master_password, salt)
-        self.fernet = Fernet(key)
+        try:
+            salt, params = self._kdf_inputs()
+            key = self._derive_key(master_password, salt, params)
+        except Exception as e:
+            return False, str(e)
+        self._use_key(key, salt, params)
         try:
             self._load_vault()
             self.is_unlocked = True
             return True, "Vault unlocked successfully."
-        except Exception:
-            self.fernet = None
+        except Exception as e:
+            self.cipher = None
+            self._key = None
             self.is_unlocked = False
-            return False, "Invalid master password."
+            if isinstance(e, (InvalidTag, InvalidToken)):
+                return False, "Invalid master password."
+            return False, f"Vault file could not be read: {e}"
+
+    def _session_id(self):
+        return hashlib.blake2b(str(self.vault_file).encode() + self._kdf_inputs()[0], digest_size=16).hexdigest()
+
+    def save_session(self, ttl=SESSION_TTL):
+        if not self.is_unlocked:
+            return False, "Vault is locked. Unlock it first."
+        if self.session_file is None:
+            return False, "XDG_RUNTIME_DIR is not set; no session saved."
+        session = {"vault": self._session_id(), "key": self._key.decode(), "expires": time.time() + ttl}
+        tmp = self.session_file.with_name(f".{SESSION_FILE_NAME}.{os.getpid()}")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_NOFOLLOW, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(session, f)
+        os.replace(tmp, self.session_file)
+        return True, f"Session active for {ttl // 60} minutes."
+
+    def unlock_from_session(self):
+        if self.session_file is None or not self.is_initialized():
+            return False, "No active session."
+        try:
+            with open(self.session_file) as f:
+                session = json.load(f)
+        except (OSError, ValueError):
+            return False, "No active session."
+        if session.get("vault") != self._session_id() or session.get("expires", 0) < time.time():
+            self.clear_session()
+            return False, "Session expired."
+        try:
+            self._use_key(session["key"].encode(), *self._kdf_inputs())
+            self._load_vault()
+        except Exception:
+            self.cipher = None
+            self._key = None
+            self.clear_session()
+            return False, "Session expired."
+        self.is_unlocked = True
+        return True, "Vault unlocked from session."
+
+    def clear_session(self):
+        # The TTL is only checked when a command reads the session, so an expired key stays
+        # on disk until then; `vault lock` is the only wipe that does not wait for a reader.
+        # Zero the key before unlinking so it does not linger in freed tmpfs pages
+        if self.session_file is None:
+            return
+        try:
+            fd = os.open(self.session_file, os.O_WRONLY | os.O_NOFOLLOW)
+        except OSError:
+            fd = None
+        if fd is not None:
+            try:
+                os.write(fd, bytes(os.fstat(fd).st_size))
+                os.fsync(fd)
+            except OSError:
+                pass
+            finally:
+                os.close(fd)
+        try:
+            os.remove(self.session_file)
+        except FileNotFoundError:
+            pass
 
     def lock(self):
-        self.fernet = None
+        self.cipher = None
+        self._key = None
         self.is_unlocked = False
+        self._cached_vault = None
+        self._cached_for = None
+        clear_key_cache()
         return True, "Vault locked."
 
+    def _cache_stamp(self, st=None):
+        st = st or self.vault_file.stat()
+        return (self.cipher, st.st_ino, st.st_mtime_ns, st.st_size)
+
+    @contextmanager
+    def _vault_locked(self):
+        # Serializes appends and snapshot rewrites across processes. The lock is a file of its
+        # own because a snapshot renames a new vault.enc into place, which would drop a lock
+        # held on the old one
+        fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o600)
+        with open(fd, 'rb') as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
     def _load_vault(self):
-        if not self.fernet:
+        if not self.cipher:
             raise Exception("Vault is locked.")
+        # unlock() and every later call in the same command would otherwise each decrypt
+        # the whole file; reuse the plaintext until the file or the key changes
+        stamp = self._cache_stamp()
+        if self._cached_vault is not None and self._cached_for == stamp:
+            return self._cached_vault
         with open(self.vault_file, 'rb') as f:
-            encrypted_data = f.read()
-        decrypted_data = self.fernet.decrypt(encrypted_data)
-        return json.loads(decrypted_data.decode())
+            self._cached_vault = self._decode_vault(f.read())
+        self._cached_for = stamp
+        self._service_index = None
+        return self._cached_vault
+
+    def _decode_vault(self, encrypted_data):
+        if encrypted_data.startswith(LOG_MAGICS):
+            return self._replay_log(encrypted_data)
+        # Single-payload vault from before the log format; the next save converts it
+        self._log_header = None
+        self._log_seq = None
+        self._log_appended = 0
+        return _loads(self.cipher.decrypt(encrypted_data))
+
+    def _log_record(self, header, seq, entry):
+        token = self.cipher.encrypt(_dumps(entry), header + seq.to_bytes(8, 'big'))
+        return len(token).to_bytes(4, 'big') + token
+
+    def _log_count(self, header, count):
+        return self.cipher.encrypt(count.to_bytes(8, 'big'), header + b'count')
+
+    def _read_log_count(self, data, header, pos):
+        """Return the highest sealed record count after the header and the first record offset."""
+        end = pos + 2 * LOG_COUNT_SIZE
+        if len(data) < end:
+            raise ValueError("Truncated vault header.")
+        counts = []
+        for slot in (data[pos:pos + LOG_COUNT_SIZE], data[pos + LOG_COUNT_SIZE:end]):
+            try:
+                counts.append(int.from_bytes(self.cipher.decrypt(bytes(slot), header + b'count'), 'big'))
+            except (InvalidTag, InvalidToken):
+                pass
+        if not counts:
+            # Neither slot opens, so this is the wrong key
+            raise InvalidTag()
+        return max(counts), end
+
+    def _replay_log(self, data):
+        vault_data = None
+        header, _, pos = _split_log(data)
+        counted = None
+        if header.startswith(LOG_MAGIC):
+            counted, pos = self._read_log_count(data, header, pos)
+        seq = 0
+        while pos < len(data) and seq != counted:
+            size = int.from_bytes(data[pos:pos + 4], 'big')
+            token = data[pos + 4:pos + 4 + size]
+            if len(token) != size:
+                if counted is not None:
+                    raise ValueError(f"Vault log ends inside record {seq} of {counted}; the file was truncated.")
+                # Uncounted logs cannot tell a torn final append from a cut: keep what
+                # was complete and have the next save rewrite the file
+                break
+            try:
+                plaintext = self.cipher.decrypt(token, header + seq.to_bytes(8, 'big'))
+            except (InvalidTag, InvalidToken):
+                if seq == 0 and counted is None:
+                    # Nothing has authenticated yet, so this is the wrong key
+                    raise
+                # The key opened the count or an earlier record, so this one was altered.
+                # Refuse the vault rather than drop the record and compact over the loss
+                raise ValueError(f"Vault log record {seq} failed to authenticate; the file is damaged.")
+            entry = _loads(plaintext)
+            if seq == 0:
+                vault_data = entry["vault"]
+            else:
+                _apply_entry(vault_data, entry)
+            pos += 4 + size
+            seq += 1
+        if vault_data is None:
+            raise ValueError("Vault log has no snapshot.")
+        if counted is not None:
+            if seq < counted:
+                raise ValueError(f"Vault log has {seq} of {counted} records; the file was truncated.")
+            tail = len(data) - pos
+            if tail >= 4 and 4 + int.from_bytes(data[pos:pos + 4], 'big') < tail:
+                raise ValueError("Vault log has data past its last counted record.")
+        # A frame past the count was never acknowledged; it and older logs are only read,
+        # and the next write replaces them with a counted snapshot
+        current = header.startswith(LOG_MAGIC) and pos == len(data)
+        self._log_header = header if current else None
+        self._log_seq = seq if current else None
+        self._log_appended = seq - 1
+        return vault_data
+
+    def _reload(self, f):
+        try:
+            return self._decode_vault(f.read())
+        except (InvalidTag, InvalidToken):
+            raise Exception("The vault was changed by another process; unlock it again.")
+
+    def _save_vault(self, vault_data, reapply=None):
+        # reapply(fresh) redoes the caller's change on the vault as it is on disk and
+        # returns what to write; without it a vault changed since loading is not overwritten
+        if not self.cipher:
+            raise Exception("Vault is locked.")
+        with self._vault_locked():
+            try:
+                f = open(self.vault_file, 'rb')
+            except FileNotFoundError:
+                f = None
+            if f is not None:
+                with f:
+                    if self._cache_stamp(os.fstat(f.fileno())) != self._cached_for:
+                        # Another process wrote since this one loaded; rewriting our copy
+                        # would drop its records
+                        if reapply is None:
+                            raise Exception("The vault was changed by another process; try again.")
+                        vault_data = reapply(self._reload(f))
+            self._write_snapshot(vault_data)
+
+    def _write_snapshot(self, vault_data):
+        self._cached_vault = None
+        # The plaintext is only ever stored encrypted, so skip indentation: less to
+        # serialize and encrypt, and a smaller vault file
+        header = _log_header({
+            "id": secrets.token_hex(16),
+            "salt": base64.b64encode(self._salt).decode(),
+            "kdf": self._kdf,
+        })
+        count = self._log_count(header, 1)
+        _write_atomic(self.vault_file, header + count + count +
+                      self._log_record(header, 0, {"op": "snapshot", "vault": vault_data}))
+        self._log_header = header
+        self._log_seq = 1
+        self._log_appended = 0
+        self._cached_vault = vault_data
+        self._cached_for = self._cache_stamp()
+        self._service_index = None
 
-    def _save_vault(self, vault_data):
-        if not self.fernet:
+    def _append_vault(self, entry, vault_data):
+        # Adds and updates only encrypt their own record; once appended records outnumber the live
+        # credentials (or the file predates the log) fold everything into a snapshot
+        if not self.cipher:
             raise Exception("Vault is locked.")
-        json_data = json.dumps(vault_data, indent=2).encode()
-        encrypted_data = self.fernet.encrypt(json_data)
-        with open(self.vault_file, 'wb') as f:
-            f.write(encrypted_data)
+        with self._vault_locked(), open(self.vault_file, 'r+b') as f:
+            if self._cache_stamp(os.fstat(f.fileno())) != self._cached_for:
+                # Another process wrote since this one loaded: the position of the next
+                # record is only known from the file, so replay it and apply ours on top
+                vault_data = self._reload(f)
+                _apply_entry(vault_data, entry)
+            live = sum(len(creds) for creds in vault_data["credentials"].values())
+            if self._log_seq is None or self._log_appended >= max(LOG_COMPACT_MIN, live):
+                self._write_snapshot(vault_data)
+                return
+            f.seek(0, os.SEEK_END)
+            f.write(self._log_record(self._log_header, self._log_seq, entry))
+            f.flush()
+            os.fsync(f.fileno())
+            # Count the record only once it is durable; until then it is a torn tail
+            count = self._log_seq + 1
+            f.seek(len(self._log_header) + (count % 2) * LOG_COUNT_SIZE)
+            f.write(self._log_count(self._log_header, count))
+            f.flush()
+            os.fsync(f.fileno())
+            self._log_seq += 1
+            self._log_appended += 1
+            self._cached_vault = vault_data
+            self._cached_for = self._cache_stamp(os.fstat(f.fileno()))
+            self._service_index = None
+
+    def compact_vault(self):
+        if not self.is_unlocked:
+            return False, "Vault is locked. Unlock it first."
+        vault_data = self._load_vault()
+        appended = self._log_appended
+        self._save_vault(vault_data, lambda fresh: fresh)
+        return True, f"Vault compacted ({appended} appended record(s) folded in)."
 
     def add_credential(self, identity_name, service, username=None, password=None, 
                       email=None, notes=None, extra_fields=None):
@@ -110,6 +728,7 @@ class CredentialVault:
         vault_data = self._load_vault()
         if identity_name not in vault_data["credentials"]:
             vault_data["credentials"][identity_name] = []
+        now = datetime.now().isoformat()
         credential = {
             "id": secrets.token_hex(8),
             "service": service,
@@ -118,11 +737,11 @@ class CredentialVault:
             "email": email,
             "notes": notes,
             "extra_fields": extra_fields or {},
-            "created": datetime.now().isoformat(),
-            "modified": datetime.now().isoformat()
+            "created": now,
+            "modified": now
         }
         vault_data["credentials"][identity_name].append(credential)
-        self._save_vault(vault_data)
+        self._append_vault({"op": "add", "identity": identity_name, "credential": credential}, vault_data)
         return True, f"Credential added for {service} under identity '{identity_name}'."
 
     def get_credentials(self, identity_name):
@@ -136,10 +755,16 @@ class CredentialVault:
         if not self.is_unlocked:
             return None, "Vault is locked. Unlock it first."
         vault_data = self._load_vault()
-        credentials = vault_data["credentials"].get(identity_name, [])
-        for cred in credentials:
-            if cred["service"].lower() == service.lower():
-                return cred, f"Found credential for {service}."
+        if self._service_index is None:
+            index = {}
+            for name, creds in vault_data["credentials"].items():
+                by_service = index[name] = {}
+                for cred in creds:
+                    by_service.setdefault(cred["service"].lower(), cred)
+            self._service_index = index
+        cred = self._service_index.get(identity_name, {}).get(service.lower())
+        if cred is not None:
+            return cred, f"Found credential for {service}."
         return None, f"No credential found for {service}."
 
     def update_credential(self, identity_name, credential_id, **updates):
@@ -149,11 +774,12 @@ class CredentialVault:
         credentials = vault_data["credentials"].get(identity_name, [])
         for cred in credentials:
             if cred["id"] == credential_id:
-                for key, value in updates.items():
-                    if key in cred and key not in ["id", "created"]:
-                        cred[key] = value
-                cred["modified"] = datetime.now().isoformat()
-                self._save_vault(vault_data)
+                fields = {key: value for key, value in updates.items()
+                          if key in cred and key not in ["id", "created"]}
+                fields["modified"] = datetime.now().isoformat()
+                cred.update(fields)
+                self._append_vault({"op": "update", "identity": identity_name,
+                                    "id": credential_id, "fields": fields}, vault_data)
                 return True, "Credential updated successfully."
         return False, "Credential not found."
 
@@ -161,12 +787,23 @@ class CredentialVault:
         if not self.is_unlocked:
             return False, "Vault is locked. Unlock it first."
         vault_data = self._load_vault()
-        credentials = vault_data["credentials"].get(identity_name, [])
-        for i, cred in enumerate(credentials):
-            if cred["id"] == credential_id:
-                del credentials[i]
-                self._save_vault(vault_data)
-                return True, "Credential deleted successfully."
+
+        def delete(vault_data):
+            credentials = vault_data["credentials"].get(identity_name, [])
+            for i, cred in enumerate(credentials):
+                if cred["id"] == credential_id:
+                    del credentials[i]
+                    return True
+            return False
+
+        def reapply(fresh):
+            delete(fresh)
+            return fresh
+
+        if delete(vault_data):
+            # Rewritten rather than tombstoned so the removed secret leaves the file now
+            self._save_vault(vault_data, reapply)
+            return True, "Credential deleted successfully."
         return False, "Credential not found."
 
     def delete_identity_credentials(self, identity_name):
@@ -176,7 +813,12 @@ class CredentialVault:
         if identity_name in vault_data["credentials"]:
             count = len(vault_data["credentials"][identity_name])
             del vault_data["credentials"][identity_name]
-            self._save_vault(vault_data)
+
+            def reapply(fresh):
+                fresh["credentials"].pop(identity_name, None)
+                return fresh
+
+            self._save_vault(vault_data, reapply)
             return True, f"Deleted {count} credential(s) for identity '{identity_name}'."
         return False, f"No credentials found for identity '{identity_name}'."
 
@@ -187,13 +829,11 @@ class CredentialVault:
         identities = list(vault_data["credentials"].keys())
         return identities, f"Found {len(identities)} identity/identities with credentials."
 
-    def list_all_credentials(self):
-        if not self.is_unlocked:
-            return None, "Vault is locked. Unlock it first."
+    def iter_credential_summary(self):
+        """Yield (identity, summaries) pairs one identity at a time."""
         vault_data = self._load_vault()
-        summary = {}
         for identity_name, credentials in vault_data["credentials"].items():
-            summary[identity_name] = [
+            yield identity_name, [
                 {
                     "id": cred["id"],
                     "service": cred["service"],
@@ -203,60 +843,117 @@ class CredentialVault:
                 }
                 for cred in credentials
             ]
-        return summary, "Credential summary retrieved."
 
-    def export_vault(self, output_path, export_password=None):
+    def list_all_credentials(self):
+        if not self.is_unlocked:
+            return None, "Vault is locked. Unlock it first."
+        return dict(self.iter_credential_summary()), "Credential summary retrieved."
+
+    def export_vault_stream(self, out, export_password, chunk_size=STREAM_CHUNK_SIZE):
         if not self.is_unlocked:
             return False, "Vault is locked. Unlock it first."
         vault_data = self._load_vault()
-        if export_password:
-            salt = secrets.token_bytes(32)
-            key = self._derive_key(export_password, salt)
-            export_fernet = Fernet(key)
-            export_data = {
-                "salt": base64.b64encode(salt).decode(),
-                "data": base64.b64encode(
-                    export_fernet.encrypt(json.dumps(vault_data).encode())
-                ).decode()
-            }
-            with open(output_path, 'w') as f:
-                json.dump(export_data, f)
-        else:
-            with open(output_path, 'wb') as f:
-                f.write(self.fernet.encrypt(json.dumps(vault_data).encode()))
+        salt = secrets.token_bytes(32)
+        prefix = secrets.token_bytes(STREAM_PREFIX_SIZE)
+        aead = AESGCM(base64.urlsafe_b64decode(self._derive_key(export_password, salt)))
+        header = STREAM_MAGIC + chunk_size.to_bytes(4, 'big') + salt + prefix
+        write_frames(out, aead, header, prefix, _json_chunks(vault_data, chunk_size))
+        return True, "Vault exported."
+
+    def _stream_frames(self, src, import_password):
+        header = src.read(STREAM_HEADER_SIZE)
+        if len(header) != STREAM_HEADER_SIZE or not header.startswith(STREAM_MAGIC):
+            raise ValueError("Not a vault export stream.")
+        chunk_size = int.from_bytes(header[4:8], 'big')
+        salt, prefix = header[8:40], header[40:]
+        aead = AESGCM(base64.urlsafe_b64decode(self._derive_key(import_password, salt)))
+        return iter_frames(src, aead, header, prefix, chunk_size)
+
+    def _import_stream(self, src, import_password, merge):
+        frames = self._stream_frames(src, import_password)
+        if merge and ijson is not None:
+            # A merge only needs the credentials: parse them one identity at a time
+            # instead of holding the whole decrypted export and its tree at once
+            pairs = ijson.kvitems(_FrameReader(frames), "credentials", use_float=True)
+            return self._merge_credentials(pairs)
+        return self._apply_import(_loads(b''.join(frames)), merge)
+
+    def export_vault(self, output_path, export_password=None):
+        if not self.is_unlocked:
+            return False, "Vault is locked. Unlock it first."
+        # A failed export leaves any earlier file at output_path untouched
+        try:
+            with _atomic_open(output_path) as f:
+                if export_password:
+                    self.export_vault_stream(f, export_password)
+                else:
+                    f.write(self.cipher.encrypt(_dumps(self._load_vault())))
+        except Exception as e:
+            return False, f"Export failed: {str(e)}"
         return True, f"Vault exported to {output_path}."
 
+    def import_vault_stream(self, src, import_password, merge=False):
+        if not self.is_unlocked:
+            return False, "Vault is locked. Unlock it first."
+        try:
+            return self._import_stream(src, import_password, merge)
+        except Exception as e:
+            return False, f"Import failed: {str(e)}"
+
+    def _apply_import(self, vault_data, merge):
+        if merge:
+            return self._merge_credentials(vault_data["credentials"].items())
+        # A replacing import discards whatever is on disk, including newer records
+        self._save_vault(vault_data, lambda fresh: vault_data)
+        return True, "Vault imported successfully."
+
+    def _merge_credentials(self, pairs):
+        current_vault = self._load_vault()
+        # A streamed source can only be read once, so remember what was merged in case
+        # it has to be merged again into a vault another process changed meanwhile
+        added = []
+        try:
+            skipped = _merge_into(current_vault, pairs, added)
+        except Exception:
+            # A streamed source can fail part-way; drop the half-merged cached copy
+            self._cached_vault = None
+            raise
+
+        def reapply(fresh):
+            _merge_into(fresh, added)
+            return fresh
+
+        self._save_vault(current_vault, reapply)
+        return True, f"Vault merged successfully ({skipped} duplicate(s) skipped)."
+
     def import_vault(self, import_path, import_password=None, merge=False):
         if not self.is_unlocked:
             return False, "Vault is locked. Unlock it first."
         try:
-            with open(import_path, 'r') as f:
-                content = f.read()
-            try:
-                export_data = json.loads(content)
-                if "salt" in export_data and "data" in export_data:
+            with open(import_path, 'rb') as f:
+                if f.read(len(STREAM_MAGIC)) == STREAM_MAGIC:
                     if not import_password:
                         return False, "Import password required for this export file."
-                    salt = base64.b64decode(export_data["salt"])
-                    key = self._derive_key(import_password, salt)
-                    import_fernet = Fernet(key)
-                    encrypted_data = base64.b64decode(export_data["data"])
-                    vault_data = json.loads(import_fernet.decrypt(encrypted_data).decode())
-            except json.JSONDecodeError:
-                with open(import_path, 'rb') as f:
-                    encrypted_data = f.read()
-                vault_data = json.loads(self.fernet.decrypt(encrypted_data).decode())
-            if merge:
-                current_vault = self._load_vault()
-                for identity_name, credentials in vault_data["credentials"].items():
-                    if identity_name not in current_vault["credentials"]:
-                        current_vault["credentials"][identity_name] = []
-                    current_vault["credentials"][identity_name].extend(credentials)
-                self._save_vault(current_vault)
-                return True, "Vault merged successfully."
+                    f.seek(0)
+                    return self._import_stream(f, import_password, merge)
+                f.seek(0)
+                content = f.read()
+            # Password-protected exports from before streaming are a JSON envelope;
+            # anything else is a payload under the vault's own key
+            if content.lstrip()[:1] == b'{':
+                export_data = _loads(content)
+                if "salt" not in export_data or "data" not in export_data:
+                    return False, "Import failed: unrecognized export file."
+                if not import_password:
+                    return False, "Import password required for this export file."
+                salt = base64.b64decode(export_data["salt"])
+                key = self._derive_key(import_password, salt)
+                import_cipher = VaultCipher(key)
+                encrypted_data = base64.b64decode(export_data["data"])
+                vault_data = _loads(import_cipher.decrypt(encrypted_data))
             else:
-                self._save_vault(vault_data)
-                return True, "Vault imported successfully."
+                vault_data = _loads(self.cipher.decrypt(content))
+            return self._apply_import(vault_data, merge)
         except Exception as e:
             return False, f"Import failed: {str(e)}"
 
@@ -266,13 +963,32 @@ class CredentialVault:
             return False, "Current password is incorrect."
         if len(new_password) < 8:
             return False, "New password must be at least 8 characters."
-        vault_data = self._load_vault()
         new_salt = secrets.token_bytes(32)
-        new_key = self._derive_key(new_password, new_salt)
-        with open(self.salt_file, 'wb') as f:
-            f.write(new_salt)
-        self.fernet = Fernet(new_key)
-        self._save_vault(vault_data)
+        # A password change also moves PBKDF2 vaults onto Argon2id where available;
+        # calibrated PBKDF2 counts carry over when it is not
+        params = self._kdf
+        if Argon2id is not None and params["algorithm"] != "argon2id":
+            params = new_kdf_params()
+        new_key = self._derive_key(new_password, new_salt, params)
+        old = (self._key, self._salt, self._kdf)
+        # Load under the lock, still with the old key, so records other processes
+        # appended are carried over instead of being dropped by the rewrite
+        with self._vault_locked():
+            vault_data = self._load_vault()
+            self._use_key(new_key, new_salt, params)
+            try:
+                # Salt and parameters sit in the snapshot header, so this one atomic replace
+                # switches the vault to the new password or leaves it on the old one
+                self._write_snapshot(vault_data)
+            except BaseException:
+                self._use_key(*old)
+                raise
+        for stale in (self.salt_file, self.kdf_file):
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+        self.clear_session()
         return True, "Master password changed successfully."
 
     def get_vault_stats(self):
@@ -282,10 +998,8 @@ class CredentialVault:
         total_credentials = sum(
             len(creds) for creds in vault_data["credentials"].values()
         )
-        services = set()
-        for creds in vault_data["credentials"].values():
-            for cred in creds:
-                services.add(cred["service"].lower())
+        services = {cred["service"].lower()
+                    for creds in vault_data["credentials"].values() for cred in creds}
         return {
             "created": vault_data.get("created"),
             "version": vault_data.get("version"),
@@ -31,29 +31,29 @@ HEADERS = {
 }
 
 
-def list_identities():
-    resp = requests.get(f"{API_BASE}/api/identities", headers=HEADERS)
+def list_identities(session):
+    resp = session.get(f"{API_BASE}/api/identities")
     resp.raise_for_status()
     data = resp.json()
     print('Identities:', data.get('identities'))
 
 
-def create_identity(name):
+def create_identity(session, name):
     payload = {
         'name': name,
         'purpose': 'example from script',
         'generate_password': True,
         'generate_passphrase': False
     }
-    resp = requests.post(f"{API_BASE}/api/identity/create", json=payload, headers=HEADERS)
+    resp = session.post(f"{API_BASE}/api/identity/create", json=payload)
     resp.raise_for_status()
     data = resp.json()
     print('Created identity:', data.get('identity'))
     return data.get('identity')
 
 
-def burn_identity(name):
-    resp = requests.delete(f"{API_BASE}/api/identity/{name}", headers=HEADERS)
+def burn_identity(session, name):
+    resp = session.delete(f"{API_BASE}/api/identity/{name}")
     if resp.status_code == 200:
         print(f"Burned identity {name}")
     else:
@@ -61,24 +61,27 @@ def burn_identity(name):
 
 
 if __name__ == '__main__':
-    try:
-        print('Listing identities...')
-        list_identities()
-
-        new_name = f"example-{uuid.uuid4().hex[:8]}"
-        print(f'Creating identity: {new_name}')
-        create_identity(new_name)
-
-        print('Listing identities after creation...')
-        list_identities()
-
-        print(f'Burning identity: {new_name}')
-        burn_identity(new_name)
-
-        print('Listing identities after burn...')
-        list_identities()
-
-    except requests.HTTPError as e:
-        print('HTTP error:', e.response.status_code, e.response.text)
-    except Exception as e:
-        print('Error:', str(e))
+    # One keep-alive connection serves every call instead of a new one per request
+    with requests.Session() as session:
+        session.headers.update(HEADERS)
+        try:
+            print('Listing identities...')
+            list_identities(session)
+
+            new_name = f"example-{uuid.uuid4().hex[:8]}"
+            print(f'Creating identity: {new_name}')
+            create_identity(session, new_name)
+
+            print('Listing identities after creation...')
+            list_identities(session)
+
+            print(f'Burning identity: {new_name}')
+            burn_identity(session, new_name)
+
+            print('Listing identities after burn...')
+            list_identities(session)
+
+        except requests.HTTPError as e:
+            print('HTTP error:', e.response.status_code, e.response.text)
+        except Exception as e:
+            print('Error:', str(e))
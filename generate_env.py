@@ -4,8 +4,8 @@ Generate .env file with secure keys for Obscura
 Run this once during initial setup
 """
 
+import base64
 import secrets
-from cryptography.fernet import Fernet
 import datetime
 import os
 
@@ -17,7 +17,8 @@ def generate_secret_key():
 
 def generate_fernet_key():
     """Generate a Fernet encryption key"""
-    return Fernet.generate_key().decode()
+    # Same format as Fernet.generate_key(), without loading cryptography for it
+    return base64.urlsafe_b64encode(secrets.token_bytes(32)).decode()
 
 
 def create_env_file():
@@ -4,14 +4,288 @@ Removes identifying metadata from files, images, and documents.
 """
 
 import os
+import re
+import mmap
 import shutil
 from pathlib import Path
 from PIL import Image
 from PIL.ExifTags import TAGS
-import exifread
 from mutagen import File as MutagenFile
 import subprocess
+import tempfile
 import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Concurrent ffmpeg remuxes in a batch; they are disk-bound, so more only add seeking
+VIDEO_JOBS = 2
+
+
+def video_strip_command(source, output_path):
+    return [
+        # Only errors reach stderr, so there is next to nothing for the caller to drain
+        'ffmpeg', '-loglevel', 'error', '-i', source,
+        '-map_metadata', '-1',
+        '-c', 'copy',
+        '-y',
+        str(output_path)
+    ]
+
+
+def video_probe_command(source, ffprobe='ffprobe'):
+    return [
+        ffprobe, '-loglevel', 'error',
+        '-show_entries', 'format_tags:stream_tags',
+        '-of', 'json',
+        source
+    ]
+
+
+# Tags the remux writes back itself, so seeing them does not mean a video needs stripping;
+# the valued ones only count as clean when they hold ffmpeg's own defaults
+VIDEO_STRUCTURAL_TAGS = frozenset({'major_brand', 'minor_version', 'compatible_brands', 'language'})
+VIDEO_DEFAULT_TAGS = {
+    'encoder': ('Lavf',),
+    'handler_name': ('VideoHandler', 'SoundHandler', 'SubtitleHandler'),
+    'vendor_id': ('[0][0][0][0]',),
+}
+
+
+# ffprobe only reports tags, so XMP, uuid and vendor udta/meta boxes need a look at the
+# boxes themselves. Only MP4/MOV are checked this way; other containers are always remuxed
+VIDEO_BOX_FORMATS = frozenset({'.mp4', '.mov'})
+BMFF_TOP_BOXES = frozenset({b'ftyp', b'moov', b'mdat', b'free', b'skip', b'wide'})
+BMFF_CONTAINERS = frozenset({b'moov', b'trak', b'mdia', b'minf', b'edts', b'udta', b'meta'})
+BMFF_METADATA_BOXES = frozenset({b'uuid', b'XMP_'})
+# udta and meta may only hold the item list, whose entries ffprobe does report as tags
+BMFF_ALLOWED_CHILDREN = {b'udta': frozenset({b'meta'}), b'meta': frozenset({b'hdlr', b'keys', b'ilst'})}
+
+
+def _bmff_boxes(f, start, end):
+    pos = start
+    while pos < end:
+        f.seek(pos)
+        header = f.read(16)
+        if len(header) < 8:
+            raise ValueError('Truncated box header')
+        size, box, body = int.from_bytes(header[:4], 'big'), header[4:8], pos + 8
+        if size == 1:
+            size, body = int.from_bytes(header[8:16], 'big'), pos + 16
+        elif size == 0:
+            size = end - pos
+        if size < body - pos or pos + size > end:
+            raise ValueError('Malformed box')
+        yield box, body, pos + size
+        pos += size
+
+
+def bmff_is_clean(f, start, end, parent=None):
+    """True when no box between start and end can carry metadata ffprobe does not show."""
+    for box, body, box_end in _bmff_boxes(f, start, end):
+        if parent is None:
+            if box not in BMFF_TOP_BOXES:
+                return False
+        elif parent in BMFF_ALLOWED_CHILDREN:
+            if box not in BMFF_ALLOWED_CHILDREN[parent]:
+                return False
+        elif box in BMFF_METADATA_BOXES:
+            return False
+        if box in BMFF_CONTAINERS:
+            if box == b'meta':
+                # ISO meta is a full box with four version/flag bytes; QuickTime's is not
+                f.seek(body)
+                if f.read(8)[4:8] != b'hdlr':
+                    body += 4
+            if not bmff_is_clean(f, body, box_end, box):
+                return False
+    return True
+
+
+def probe_has_metadata(probe):
+    for section in [probe.get('format', {})] + probe.get('streams', []):
+        for key, value in section.get('tags', {}).items():
+            key = key.lower()
+            if key in VIDEO_STRUCTURAL_TAGS:
+                continue
+            if not str(value).startswith(VIDEO_DEFAULT_TAGS.get(key, ())):
+                return True
+    return False
+
+
+# APP1-APP13, APP15 and comments carry EXIF, XMP, ICC, IPTC and vendor data; APP0 (JFIF)
+# and APP14 (Adobe colour transform) are needed to decode the image correctly.
+JPEG_DROP_MARKERS = frozenset(range(0xE1, 0xEE)) | {0xEF, 0xFE}
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# PNG keeps only the critical chunks and the ones that change how pixels render; text,
+# eXIf, tIME, iCCP (which names its profile), C2PA and private vendor chunks all go
+PNG_KEEP_CHUNKS = frozenset({b'IHDR', b'PLTE', b'IDAT', b'IEND',
+                             b'tRNS', b'gAMA', b'cHRM', b'sRGB', b'pHYs'})
+
+
+# Entropy-coded data runs until the first 0xFF that is not stuffing (FF00), fill (FFFF)
+# or a restart marker; searching for it in one regex keeps the per-byte work in C
+JPEG_SCAN_END = re.compile(rb'\xff[^\x00\xd0-\xd7\xff]')
+
+
+def _jpeg_scan_end(buf, pos):
+    match = JPEG_SCAN_END.search(buf, pos)
+    if match is None:
+        raise ValueError('Unterminated JPEG scan')
+    return match.start()
+
+
+def jpeg_kept_ranges(buf):
+    n = len(buf)
+    if buf[:2] != b'\xff\xd8':
+        raise ValueError('Not a JPEG file')
+    yield 0, 2
+    pos = 2
+    while pos + 1 < n:
+        if buf[pos] != 0xFF:
+            raise ValueError('Malformed JPEG marker')
+        marker = buf[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker == 0xD9:
+            # Anything after EOI is a trailer, not image data
+            yield pos, pos + 2
+            return
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            yield pos, pos + 2
+            pos += 2
+            continue
+        end = pos + 2 + int.from_bytes(buf[pos + 2:pos + 4], 'big')
+        if end > n:
+            raise ValueError('Truncated JPEG segment')
+        if marker == 0xDA:
+            end = _jpeg_scan_end(buf, end)
+        if marker not in JPEG_DROP_MARKERS:
+            yield pos, end
+        pos = end
+    raise ValueError('Missing JPEG EOI marker')
+
+
+def png_kept_ranges(buf):
+    n = len(buf)
+    if buf[:8] != PNG_SIGNATURE:
+        raise ValueError('Not a PNG file')
+    yield 0, 8
+    pos = 8
+    while pos + 8 <= n:
+        end = pos + 12 + int.from_bytes(buf[pos:pos + 4], 'big')
+        chunk_type = buf[pos + 4:pos + 8]
+        if end > n:
+            raise ValueError('Truncated PNG chunk')
+        if chunk_type in PNG_KEEP_CHUNKS:
+            yield pos, end
+        if chunk_type == b'IEND':
+            return
+        pos = end
+    raise ValueError('Missing PNG IEND chunk')
+
+
+SEGMENT_WALKERS = {'JPEG': jpeg_kept_ranges, 'PNG': png_kept_ranges}
+
+
+def copy_kept_segments(source, output, walker):
+    """Copy only the segments walker keeps; returns False if the file could not be walked."""
+    in_place = os.path.abspath(output) == os.path.abspath(source)
+    with open(source, 'rb') as src:
+        try:
+            mm = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return False
+        with mm:
+            try:
+                ranges = []
+                for start, end in walker(mm):
+                    if ranges and ranges[-1][1] == start:
+                        ranges[-1][1] = end
+                    else:
+                        ranges.append([start, end])
+            except (ValueError, IndexError):
+                return False
+            if in_place and ranges == [[0, len(mm)]]:
+                # Nothing to drop (a clean screenshot, say): leave the file untouched
+                return True
+            if in_place:
+                fd, target = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(source)))
+                out = os.fdopen(fd, 'wb')
+            else:
+                target = output
+                out = open(output, 'wb')
+            with out, memoryview(mm) as view:
+                for start, end in ranges:
+                    out.write(view[start:end])
+    if in_place:
+        shutil.copymode(source, target)
+        os.replace(target, source)
+    return True
+
+
+class VideoStripPipe:
+    """Feed a video to ffmpeg over stdin while it is still being received."""
+
+    def __init__(self, output_path, timeout=300):
+        self.output_path = output_path
+        self.timeout = timeout
+        self.broken = False
+        self._errors = tempfile.TemporaryFile()
+        self._proc = subprocess.Popen(
+            video_strip_command('pipe:0', output_path),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=self._errors
+        )
+
+    def write(self, data):
+        if self.broken:
+            return
+        try:
+            self._proc.stdin.write(data)
+        except OSError:
+            self.broken = True
+
+    def finish(self):
+        try:
+            self._proc.stdin.close()
+        except OSError:
+            self.broken = True
+        try:
+            returncode = self._proc.wait(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            self.abort()
+            return False, "FFmpeg timed out"
+        self._errors.seek(0)
+        stderr = self._errors.read().decode(errors='replace')
+        self._errors.close()
+        if returncode == 0 and not self.broken:
+            return True, f"Video metadata stripped. Output: {self.output_path}"
+        return False, f"FFmpeg error: {stderr}"
+
+    def abort(self):
+        if self._proc.poll() is None:
+            self._proc.kill()
+            self._proc.wait()
+        try:
+            self._proc.stdin.close()
+        except OSError:
+            pass
+        self._errors.close()
+
+
+def _scan_files(directory, recursive):
+    """Yield DirEntry objects for regular files, not following symlinks."""
+    pending = [directory]
+    while pending:
+        with os.scandir(pending.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
 
 
 class MetadataStripper:
@@ -21,46 +295,89 @@ class MetadataStripper:
         self.supported_image_formats = {'.jpg', '.jpeg', '.png', '.tiff', '.tif', '.webp'}
         self.supported_audio_formats = {'.mp3', '.flac', '.ogg', '.m4a', '.wav'}
         self.supported_video_formats = {'.mp4', '.avi', '.mov', '.mkv', '.webm'}
+        # Formats whose metadata always sits in the leading segments of the file
+        self.header_metadata_formats = {'.jpg', '.jpeg'}
+        # Stripped by copying byte ranges, which is I/O rather than Python-bound work
+        self.segment_copy_formats = {'.jpg', '.jpeg', '.png'}
+        # One lookup per file instead of probing each format set in turn
+        self.kinds_by_ext = {
+            **dict.fromkeys(self.supported_image_formats, 'image'),
+            **dict.fromkeys(self.supported_audio_formats, 'audio'),
+            **dict.fromkeys(self.supported_video_formats, 'video'),
+        }
+        self._strippers = {
+            'image': self._strip_image,
+            'audio': self._strip_audio,
+            'video': self._strip_video,
+        }
+        self._mat2_path = shutil.which('mat2')
+        self._ffprobe_path = shutil.which('ffprobe')
     
     def strip_image_metadata(self, file_path, output_path=None):
+        success, message, _ = self._strip_image(file_path, output_path)
+        return success, message
+
+    def _strip_image(self, file_path, output_path=None):
         try:
             file_path = Path(file_path)
             if not file_path.exists():
-                return False, "File not found"
+                return False, "File not found", 0
             if file_path.suffix.lower() not in self.supported_image_formats:
-                return False, f"Unsupported image format: {file_path.suffix}"
-            img = Image.open(file_path)
-            exif_data = img.getexif()
-            metadata_info = {}
-            if exif_data:
-                for tag_id, value in exif_data.items():
-                    tag = TAGS.get(tag_id, tag_id)
-                    metadata_info[tag] = str(value)
-            data = list(img.getdata())
-            image_without_exif = Image.new(img.mode, img.size)
-            image_without_exif.putdata(data)
+                return False, f"Unsupported image format: {file_path.suffix}", 0
             output = output_path if output_path else file_path
-            image_without_exif.save(output, quality=95, optimize=True)
-            return True, f"Stripped metadata: {len(metadata_info)} fields removed"
+            with Image.open(file_path) as img:
+                removed = len(img.getexif())
+                walker = SEGMENT_WALKERS.get(img.format)
+            # JPEG and PNG keep their metadata in separate segments, so they can be
+            # dropped without decoding; other formats are re-encoded from the pixels
+            if walker is not None and copy_kept_segments(file_path, output, walker):
+                return True, f"Stripped metadata: {removed} fields removed", removed
+            with Image.open(file_path) as img:
+                # Copy the pixel buffer straight across; the palette comes along, but
+                # none of the info/EXIF the encoder would otherwise write back
+                image_without_exif = Image.frombytes(img.mode, img.size, img.tobytes())
+                if img.palette is not None:
+                    image_without_exif.putpalette(img.getpalette())
+            if os.path.abspath(output) != os.path.abspath(file_path):
+                image_without_exif.save(output, quality=95, optimize=True)
+                return True, f"Stripped metadata: {removed} fields removed", removed
+            # Encode beside the original and rename over it, so a failed save
+            # never leaves a truncated image behind
+            fd, target = tempfile.mkstemp(dir=file_path.parent, suffix=file_path.suffix)
+            os.close(fd)
+            try:
+                image_without_exif.save(target, quality=95, optimize=True)
+                shutil.copymode(file_path, target)
+                os.replace(target, file_path)
+            except BaseException:
+                os.unlink(target)
+                raise
+            return True, f"Stripped metadata: {removed} fields removed", removed
         except Exception as e:
-            return False, f"Error stripping metadata: {str(e)}"
+            return False, f"Error stripping metadata: {str(e)}", 0
     
     def strip_audio_metadata(self, file_path, output_path=None):
+        success, message, _ = self._strip_audio(file_path, output_path)
+        return success, message
+
+    def _strip_audio(self, file_path, output_path=None):
         try:
             file_path = Path(file_path)
             if not file_path.exists():
-                return False, "File not found"
+                return False, "File not found", 0
             if file_path.suffix.lower() not in self.supported_audio_formats:
-                return False, f"Unsupported audio format: {file_path.suffix}"
+                return False, f"Unsupported audio format: {file_path.suffix}", 0
             audio_file = MutagenFile(file_path)
             if audio_file is None:
-                return False, "Could not read audio file"
+                return False, "Could not read audio file", 0
             metadata_count = len(audio_file.keys())
-            audio_file.delete()
-            audio_file.save()
-            return True, f"Stripped {metadata_count} metadata fields from audio file"
+            # delete() already rewrites the file without its tags; a save() afterwards
+            # would rewrite it again just to add back an empty, padded tag block
+            if audio_file.tags is not None:
+                audio_file.delete()
+            return True, f"Stripped {metadata_count} metadata fields from audio file", metadata_count
         except Exception as e:
-            return False, f"Error stripping audio metadata: {str(e)}"
+            return False, f"Error stripping audio metadata: {str(e)}", 0
     
     def strip_video_metadata(self, file_path, output_path=None):
         try:
@@ -71,16 +388,17 @@ class MetadataStripper:
                 return False, f"Unsupported video format: {file_path.suffix}"
             if not output_path:
                 output_path = file_path.parent / f"{file_path.stem}_stripped{file_path.suffix}"
-            cmd = [
-                'ffmpeg', '-i', str(file_path),
-                '-map_metadata', '-1',
-                '-c', 'copy',
-                '-y',
-                str(output_path)
-            ]
+            if not self._video_has_metadata(file_path):
+                # Nothing to drop, so skip the remux; a plain copy still produces the output
+                if os.path.abspath(output_path) != os.path.abspath(file_path):
+                    shutil.copyfile(file_path, output_path)
+                return True, f"Video has no metadata to strip. Output: {output_path}"
+            cmd = video_strip_command(str(file_path), output_path)
             result = subprocess.run(
                 cmd,
-                capture_output=True,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 text=True,
                 timeout=300
             )
@@ -93,15 +411,52 @@ class MetadataStripper:
         except Exception as e:
             return False, f"Error stripping video metadata: {str(e)}"
     
+    def _video_has_metadata(self, file_path):
+        """Check the boxes and probe the tags; anything unexpected (or no ffprobe) means remux."""
+        if not self._ffprobe_path:
+            return True
+        if os.path.splitext(file_path)[1].lower() not in VIDEO_BOX_FORMATS:
+            return True
+        try:
+            with open(file_path, 'rb') as f:
+                if not bmff_is_clean(f, 0, os.fstat(f.fileno()).st_size):
+                    return True
+        except (OSError, ValueError):
+            return True
+        try:
+            result = subprocess.run(
+                video_probe_command(str(file_path), self._ffprobe_path),
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                timeout=60
+            )
+            if result.returncode != 0:
+                return True
+            return probe_has_metadata(json.loads(result.stdout))
+        except (OSError, subprocess.TimeoutExpired, ValueError):
+            return True
+
+    def _strip_video(self, file_path, output_path=None):
+        success, message = self.strip_video_metadata(file_path, output_path)
+        return success, message, 0
+
+    def open_video_strip_pipe(self, output_path):
+        return VideoStripPipe(output_path)
+
+    def strip_and_count(self, file_path, kind, output_path=None):
+        strip = self._strippers.get(kind)
+        if strip is None:
+            return False, f"Unsupported file kind: {kind}", 0
+        return strip(file_path, output_path)
+
     def strip_document_metadata(self, file_path, output_path=None):
         try:
             file_path = Path(file_path)
             if not file_path.exists():
                 return False, "File not found"
-            result = subprocess.run(['which', 'mat2'], capture_output=True)
-            if result.returncode == 0:
+            if self._mat2_path:
                 output = output_path if output_path else file_path
-                cmd = ['mat2', '--inplace', str(file_path)]
+                cmd = [self._mat2_path, '--inplace', str(file_path)]
                 subprocess.run(cmd, capture_output=True)
                 return True, "Document metadata stripped using mat2"
             else:
@@ -109,7 +464,16 @@ class MetadataStripper:
         except Exception as e:
             return False, f"Error stripping document metadata: {str(e)}"
     
-    def batch_strip(self, directory, file_types=None, recursive=True):
+    def kind_for(self, ext):
+        return self.kinds_by_ext.get(ext)
+
+    def batch_strip(self, directory, file_types=None, recursive=True, jobs=None):
+        """Strip every supported file under directory.
+
+        Image and audio files are spread over spawned worker processes, which re-import
+        the calling script: scripts must call this under ``if __name__ == "__main__":``,
+        or pass ``jobs=1`` to strip everything in this process.
+        """
         directory = Path(directory)
         if not directory.exists():
             return {"error": "Directory not found"}
@@ -119,32 +483,66 @@ class MetadataStripper:
             "failed": 0,
             "errors": []
         }
-        pattern = "**/*" if recursive else "*"
-        files = list(directory.glob(pattern))
-        for file_path in files:
-            if not file_path.is_file():
-                continue
-            ext = file_path.suffix.lower()
+        paths, kinds, outputs, copies = [], [], [], []
+        for entry in _scan_files(directory, recursive):
+            name = entry.name
+            # Same rule as Path.suffix, without building a Path per directory entry
+            dot = name.rfind('.')
+            ext = name[dot:].lower() if dot > 0 else ''
             if file_types and ext not in file_types:
                 continue
             results["processed"] += 1
-            if ext in self.supported_image_formats:
-                success, message = self.strip_image_metadata(file_path)
-            elif ext in self.supported_audio_formats:
-                success, message = self.strip_audio_metadata(file_path)
-            elif ext in self.supported_video_formats:
-                success, message = self.strip_video_metadata(file_path, 
-                    file_path.parent / f"{file_path.stem}_stripped{ext}")
-            else:
+            kind = self.kinds_by_ext.get(ext)
+            if kind is None:
                 continue
+            if ext in self.segment_copy_formats:
+                copies.append(len(paths))
+            paths.append(entry.path)
+            kinds.append(kind)
+            outputs.append(os.path.join(os.path.dirname(entry.path), f"{name[:dot]}_stripped{ext}")
+                           if kind == 'video' else None)
+        outcomes = [None] * len(paths)
+        videos = [i for i, kind in enumerate(kinds) if kind == 'video']
+        copied = set(copies)
+        others = [i for i, kind in enumerate(kinds) if kind != 'video' and i not in copied]
+        # ffmpeg already runs in its own process, so a couple of threads overlap the
+        # remuxes while the image and audio jobs keep every core busy
+        video_workers = max(1, min(VIDEO_JOBS, jobs or VIDEO_JOBS, len(videos)))
+        # Segment copies spend their time in read/write with the GIL released, so
+        # threads handle them without the start-up and pickling of worker processes
+        copy_workers = max(1, min(jobs or os.cpu_count() or 1, len(copies)))
+        with ThreadPoolExecutor(max_workers=video_workers) as video_pool, \
+                ThreadPoolExecutor(max_workers=copy_workers) as copy_pool:
+            pending = [(i, video_pool.submit(self.strip_and_count, paths[i], kinds[i], outputs[i]))
+                       for i in videos]
+            pending += [(i, copy_pool.submit(self._strip_image, paths[i])) for i in copies]
+            workers = min(jobs or os.cpu_count() or 1, len(others))
+            if workers > 1:
+                # Files are independent, so spread them over one process per core; batch
+                # several per task to cut pickling round trips without starving workers
+                chunksize = max(1, min(16, len(others) // (workers * 4)))
+                # spawn rather than fork: the video and copy pools above are already running
+                with ProcessPoolExecutor(max_workers=workers,
+                                         mp_context=multiprocessing.get_context('spawn')) as pool:
+                    done = pool.map(strip_in_worker, [paths[i] for i in others],
+                                    [kinds[i] for i in others], [outputs[i] for i in others],
+                                    chunksize=chunksize)
+                    for i, outcome in zip(others, done):
+                        outcomes[i] = outcome
+            else:
+                for i in others:
+                    outcomes[i] = self.strip_and_count(paths[i], kinds[i], outputs[i])
+            for i, future in pending:
+                outcomes[i] = future.result()
+        for file_path, (success, message, _) in zip(paths, outcomes):
             if success:
                 results["successful"] += 1
             else:
                 results["failed"] += 1
-                results["errors"].append(f"{file_path.name}: {message}")
+                results["errors"].append(f"{os.path.basename(file_path)}: {message}")
         return results
     
-    def inspect_metadata(self, file_path):
+    def inspect_metadata(self, file_path, stringify=False):
         file_path = Path(file_path)
         if not file_path.exists():
             return {"error": "File not found"}
@@ -153,20 +551,43 @@ class MetadataStripper:
             "size": file_path.stat().st_size,
             "metadata": {}
         }
-        ext = file_path.suffix.lower()
+        return self._read_metadata(file_path, file_path.suffix.lower(), metadata, stringify)
+
+    def inspect_metadata_stream(self, fileobj, ext, size, name=None, stringify=False):
+        metadata = {
+            "file": name,
+            "size": size,
+            "metadata": {}
+        }
+        fileobj.seek(0)
+        return self._read_metadata(fileobj, ext.lower(), metadata, stringify)
+
+    def _read_metadata(self, source, ext, metadata, stringify=False):
+        # Tag values are returned as parsed (rationals, tuples, frames); stringify is for
+        # callers that need plain text, such as a JSON response
+        fmt = str if stringify else (lambda value: value)
         try:
             if ext in self.supported_image_formats:
-                img = Image.open(file_path)
+                img = Image.open(source)
                 exif_data = img.getexif()
                 if exif_data:
-                    for tag_id, value in exif_data.items():
-                        tag = TAGS.get(tag_id, tag_id)
-                        metadata["metadata"][tag] = str(value)
+                    tag_name = TAGS.get
+                    metadata["metadata"].update(
+                        (tag_name(tag_id, tag_id), fmt(value)) for tag_id, value in exif_data.items())
             elif ext in self.supported_audio_formats:
-                audio_file = MutagenFile(file_path)
+                audio_file = MutagenFile(source)
                 if audio_file:
                     for key, value in audio_file.items():
-                        metadata["metadata"][key] = str(value)
+                        metadata["metadata"][key] = fmt(value)
         except Exception as e:
             metadata["error"] = str(e)
         return metadata
+
+
+_worker_stripper = None
+
+def strip_in_worker(file_path, kind, output_path=None):
+    global _worker_stripper
+    if _worker_stripper is None:
+        _worker_stripper = MetadataStripper()
+    return _worker_stripper.strip_and_count(file_path, kind, output_path)
@@ -3,16 +3,85 @@ Password Generator Module
 Generate secure passwords and passphrases.
 """
 
-import secrets
+import os
 import string
 import math
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import combinations
+
+
+# struct codes for unsigned ints of each byte width, as read by memoryview.cast
+WORD_FORMATS = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}
+
+
+def random_choices(population, k):
+    """Pick k uniformly random items, reading os.urandom once rather than once per item."""
+    n = len(population)
+    # Draw whole machine words so the buffer can be read back as an array of ints
+    width = 1 if n <= 0x100 else 2 if n <= 0x10000 else 4 if n <= 0x100000000 else 8
+    # Reject the top partial range so every item stays equally likely
+    limit = (1 << 8 * width) // n * n
+    picked = []
+    while len(picked) < k:
+        need = k - len(picked)
+        for value in memoryview(os.urandom((need + need // 2 + 8) * width)).cast(WORD_FORMATS[width]):
+            if value < limit:
+                picked.append(population[value % n])
+                if len(picked) == k:
+                    break
+    return picked
+
+
+@lru_cache(maxsize=None)
+def _byte_table(chars):
+    n = len(chars)
+    limit = 256 - 256 % n
+    table = bytes(ord(chars[b % n]) if b < limit else 0 for b in range(256))
+    return table, bytes(range(limit, 256))
+
+
+def random_string(chars, k):
+    """k uniformly random characters from an ASCII charset, mapped and filtered in C."""
+    # translate() drops the biased top bytes and maps the rest in one pass, so no
+    # Python code runs per character
+    table, rejected = _byte_table(chars)
+    out = b''
+    while len(out) < k:
+        need = k - len(out)
+        out += os.urandom(need + need // 2 + 8).translate(table, rejected)
+    return out[:k].decode('ascii')
+
+
+PASSWORD_SYMBOLS = "!@#$%^&*()_+-=[]{}|;:,.<>?"
+USERNAME_CHARS = string.ascii_lowercase + string.digits
+AMBIGUOUS_DELETE = str.maketrans('', '', "0O1lI")
+
+
+@lru_cache(maxsize=None)
+def password_charset(uppercase, lowercase, numbers, symbols, exclude_ambiguous):
+    """The characters a password may use; only 32 combinations exist, so each is built once."""
+    chars = ""
+    if lowercase:
+        chars += string.ascii_lowercase
+    if uppercase:
+        chars += string.ascii_uppercase
+    if numbers:
+        chars += string.digits
+    if symbols:
+        chars += PASSWORD_SYMBOLS
+    if exclude_ambiguous:
+        chars = chars.translate(AMBIGUOUS_DELETE)
+    if not chars:
+        chars = string.ascii_letters + string.digits
+    return chars
 
 
 class PasswordGenerator:
     """Generate secure passwords and passphrases."""
     
     # Common word list for passphrases (EFF word list subset)
-    WORDLIST = [
+    WORDLIST = (
         "abandon", "ability", "able", "about", "above", "absent", "absorb", "abstract",
         "absurd", "abuse", "access", "accident", "account", "accuse", "achieve", "acid",
         "acoustic", "acquire", "across", "action", "actor", "actress", "actual", "adapt",
@@ -123,74 +192,75 @@ class PasswordGenerator:
         "hobby", "hockey", "hold", "hole", "holiday", "hollow", "home", "honey",
         "hood", "hope", "horn", "horror", "horse", "hospital", "host", "hotel",
         "hour", "hover", "hub", "huge", "human", "humble", "humor", "hundred"
-    ]
+    )
     
+    # (characters, size) per class counted towards the entropy estimate
+    CHARSET_CLASSES = (
+        (frozenset(string.ascii_lowercase), 26),
+        (frozenset(string.ascii_uppercase), 26),
+        (frozenset(string.digits), 10),
+        (frozenset(string.punctuation), 32),
+    )
+
+    # Entropy below each threshold gets the rating at the same index; the last is open-ended
+    STRENGTH_THRESHOLDS = (28, 36, 60, 128)
+    STRENGTH_RATINGS = (
+        ("very_weak", "Very Weak - Easy to crack"),
+        ("weak", "Weak - Could be cracked quickly"),
+        ("reasonable", "Reasonable - Moderate protection"),
+        ("strong", "Strong - Good protection"),
+        ("very_strong", "Very Strong - Excellent protection"),
+    )
+
+    __slots__ = ('default_length', 'default_words')
+
     def __init__(self):
         self.default_length = 20
         self.default_words = 5
     
     def generate_password(self, length=None, uppercase=True, lowercase=True, 
                          numbers=True, symbols=True, exclude_ambiguous=True):
+        return self.generate_password_batch(1, length, uppercase, lowercase, numbers, symbols, exclude_ambiguous)[0]
+
+    def generate_password_batch(self, count, length=None, uppercase=True, lowercase=True,
+                                numbers=True, symbols=True, exclude_ambiguous=True):
         length = length or self.default_length
-        chars = ""
-        if lowercase:
-            chars += string.ascii_lowercase
-        if uppercase:
-            chars += string.ascii_uppercase
-        if numbers:
-            chars += string.digits
-        if symbols:
-            chars += "!@#$%^&*()_+-=[]{}|;:,.<>?"
-        if exclude_ambiguous:
-            ambiguous = "0O1lI"
-            chars = ''.join(c for c in chars if c not in ambiguous)
-        if not chars:
-            chars = string.ascii_letters + string.digits
-        password = ''.join(secrets.choice(chars) for _ in range(length))
-        return password
+        if length < 1:
+            raise ValueError("Password length must be at least 1")
+        chars = password_charset(bool(uppercase), bool(lowercase), bool(numbers),
+                                 bool(symbols), bool(exclude_ambiguous))
+        picked = random_string(chars, count * length)
+        return [picked[i:i + length] for i in range(0, count * length, length)]
     
     def generate_passphrase(self, words=None, separator="-", capitalize=False):
+        return self.generate_passphrase_batch(1, words, separator, capitalize)[0]
+
+    def generate_passphrase_batch(self, count, words=None, separator="-", capitalize=False):
         words = words or self.default_words
-        selected_words = [secrets.choice(self.WORDLIST) for _ in range(words)]
+        if words < 1:
+            raise ValueError("Passphrase must have at least 1 word")
+        selected_words = random_choices(self.WORDLIST, count * words)
         if capitalize:
             selected_words = [word.capitalize() for word in selected_words]
-        return separator.join(selected_words)
+        return [separator.join(selected_words[i:i + words]) for i in range(0, count * words, words)]
     
     def generate_pin(self, length=6):
-        return ''.join(secrets.choice(string.digits) for _ in range(length))
+        return random_string(string.digits, length)
     
     def calculate_entropy(self, password):
-        charset_size = 0
-        if any(c in string.ascii_lowercase for c in password):
-            charset_size += 26
-        if any(c in string.ascii_uppercase for c in password):
-            charset_size += 26
-        if any(c in string.digits for c in password):
-            charset_size += 10
-        if any(c in string.punctuation for c in password):
-            charset_size += 32
+        # Map every ASCII character to its class number in C, then probe for each class;
+        # non-ASCII characters belong to no class, so they are dropped up front
+        classes = password.encode('ascii', 'ignore').translate(CHARSET_CLASS_TABLE)
+        charset_size = sum(size for number, (_, size) in enumerate(self.CHARSET_CLASSES, 1)
+                           if number in classes)
         if charset_size == 0:
             return 0
-        entropy = len(password) * math.log2(charset_size)
+        entropy = len(password) * LOG2_BY_CHARSET_SIZE[charset_size]
         return round(entropy, 2)
     
     def get_strength(self, password):
         entropy = self.calculate_entropy(password)
-        if entropy < 28:
-            rating = "very_weak"
-            description = "Very Weak - Easy to crack"
-        elif entropy < 36:
-            rating = "weak"
-            description = "Weak - Could be cracked quickly"
-        elif entropy < 60:
-            rating = "reasonable"
-            description = "Reasonable - Moderate protection"
-        elif entropy < 128:
-            rating = "strong"
-            description = "Strong - Good protection"
-        else:
-            rating = "very_strong"
-            description = "Very Strong - Excellent protection"
+        rating, description = self.STRENGTH_RATINGS[bisect_right(self.STRENGTH_THRESHOLDS, entropy)]
         return {
             "password_length": len(password),
             "entropy_bits": entropy,
@@ -199,11 +269,29 @@ class PasswordGenerator:
         }
     
     def generate_username_password_pair(self, username_length=12, password_length=20):
-        username_chars = string.ascii_lowercase + string.digits
-        username = ''.join(secrets.choice(username_chars) for _ in range(username_length))
+        username = random_string(USERNAME_CHARS, username_length)
         password = self.generate_password(length=password_length)
         return {
             "username": username,
             "password": password,
             "strength": self.get_strength(password)
         }
+
+
+# calculate_entropy only ever sees sums of the class sizes, so take their logs once
+LOG2_BY_CHARSET_SIZE = {
+    total: math.log2(total)
+    for total in {
+        sum(combo)
+        for r in range(1, len(PasswordGenerator.CHARSET_CLASSES) + 1)
+        for combo in combinations([size for _, size in PasswordGenerator.CHARSET_CLASSES], r)
+    }
+}
+
+
+# Byte -> 1-based index of its entry in CHARSET_CLASSES, or 0 for characters in none
+CHARSET_CLASS_TABLE = bytes(
+    next((number for number, (chars, _) in enumerate(PasswordGenerator.CHARSET_CLASSES, 1)
+          if chr(b) in chars), 0)
+    for b in range(256)
+)